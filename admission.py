@@ -0,0 +1,229 @@
+import math
+import os
+import threading
+import time
+from functools import wraps
+from typing import Callable, Dict, List, Optional, Tuple
+
+from flask import jsonify, request, session
+
+try:
+    import fcntl
+except ImportError:  # Windows: write slots stay per process.
+    fcntl = None
+
+MAX_TRACKED_BUCKETS = 10000
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: float, now: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = now
+
+    def refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_seconds(self, cost: int = 1) -> float:
+        return max(0.0, (cost - self.tokens) / self.rate)
+
+
+class WriteSlots:
+    """Caps concurrent writes for one endpoint group.
+
+    Slots are always bounded per process. Once ``share`` points them at a
+    directory, each slot is also an ``flock`` on a file there, so every
+    worker process using that directory draws from the same pool. The
+    kernel drops the locks of a process that dies, so no slot is leaked.
+    """
+
+    def __init__(self, scope: str, limit: int):
+        self.scope = scope
+        self.limit = limit
+        self.lock_dir: Optional[str] = None
+        self._local = threading.BoundedSemaphore(limit)
+
+    def share(self, lock_dir: str) -> None:
+        if fcntl is None:
+            return
+        os.makedirs(lock_dir, exist_ok=True)
+        self.lock_dir = lock_dir
+
+    def try_acquire(self) -> Optional[int]:
+        """Claim a slot, returning a handle for ``release`` or None if none is free."""
+        if not self._local.acquire(blocking=False):
+            return None
+        if self.lock_dir is None:
+            return -1
+        try:
+            for index in range(self.limit):
+                path = os.path.join(self.lock_dir, f"{self.scope}-{index}.lock")
+                fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    return fd
+                except BlockingIOError:
+                    os.close(fd)
+        except OSError:
+            self._local.release()
+            raise
+        self._local.release()
+        return None
+
+    def release(self, handle: int) -> None:
+        if handle >= 0:
+            os.close(handle)
+        self._local.release()
+
+
+class RateLimiter:
+    """Per-client token buckets and a write slot pool for one endpoint group.
+
+    A request is charged against both its IP bucket and, when signed in, its
+    user bucket; it is only admitted if every bucket has a token to spend.
+    Buckets live in process memory, so with several worker processes each
+    client's effective rate is multiplied by the worker count.
+    """
+
+    def __init__(self, scope: str, rate: float, burst: float, max_in_flight: int):
+        self.scope = scope
+        self.rate = rate
+        self.burst = burst
+        self.slots = WriteSlots(scope, max_in_flight)
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def try_acquire(self, keys: List[str], cost: int = 1) -> Tuple[bool, float]:
+        now = time.monotonic()
+        with self._lock:
+            if len(self._buckets) > MAX_TRACKED_BUCKETS:
+                self._prune(now)
+            buckets = []
+            for key in keys:
+                bucket = self._buckets.get(key)
+                if bucket is None:
+                    bucket = self._buckets[key] = TokenBucket(self.rate, self.burst, now)
+                bucket.refill(now)
+                buckets.append(bucket)
+            empty = [bucket for bucket in buckets if bucket.tokens < cost]
+            if empty:
+                return False, max(bucket.wait_seconds(cost) for bucket in empty)
+            for bucket in buckets:
+                bucket.tokens -= cost
+            return True, 0.0
+
+    def _prune(self, now: float) -> None:
+        refill_seconds = self.burst / self.rate
+        stale = [key for key, bucket in self._buckets.items() if now - bucket.updated > refill_seconds]
+        for key in stale:
+            del self._buckets[key]
+
+
+class AdmissionStats:
+    """Admission counters and in-flight writes per scope, for this process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[str, int]] = {}
+
+    def _scope(self, scope: str) -> Dict[str, int]:
+        return self._counters.setdefault(
+            scope, {"admitted": 0, "rate_limited": 0, "overloaded": 0, "too_large": 0, "in_flight": 0}
+        )
+
+    def incr(self, scope: str, counter: str) -> None:
+        with self._lock:
+            self._scope(scope)[counter] += 1
+
+    def track_write(self, scope: str, delta: int) -> None:
+        with self._lock:
+            self._scope(scope)["in_flight"] += delta
+
+    def snapshot(self) -> Dict[str, object]:
+        with self._lock:
+            scopes = {scope: dict(counters) for scope, counters in self._counters.items()}
+        for limiter in (attempt_limiter, auth_limiter):
+            scopes.setdefault(limiter.scope, {})["max_in_flight"] = limiter.slots.limit
+            scopes[limiter.scope]["shared_across_processes"] = limiter.slots.lock_dir is not None
+        return {"scopes": scopes}
+
+
+stats = AdmissionStats()
+
+attempt_limiter = RateLimiter(
+    "attempts",
+    rate=float(os.environ.get("DAILYREAD_ATTEMPT_RATE", "1")),
+    burst=float(os.environ.get("DAILYREAD_ATTEMPT_BURST", "10")),
+    max_in_flight=int(os.environ.get("DAILYREAD_MAX_INFLIGHT_WRITES", "8")),
+)
+# Auth gets its own slots so password hashing during a login burst cannot
+# starve attempt writes.
+auth_limiter = RateLimiter(
+    "auth",
+    rate=float(os.environ.get("DAILYREAD_AUTH_RATE", "0.2")),
+    burst=float(os.environ.get("DAILYREAD_AUTH_BURST", "5")),
+    max_in_flight=int(os.environ.get("DAILYREAD_MAX_INFLIGHT_AUTH", "4")),
+)
+
+
+def share_write_slots(lock_dir: str) -> None:
+    """Enforce the in-flight write caps across every process sharing ``lock_dir``."""
+    for limiter in (attempt_limiter, auth_limiter):
+        limiter.slots.share(lock_dir)
+
+
+def client_keys() -> List[str]:
+    keys = [f"ip:{request.remote_addr}"]
+    user_id: Optional[int] = session.get("user_id")
+    if user_id:
+        keys.append(f"user:{user_id}")
+    return keys
+
+
+def rejection(message: str, status: int, retry_after: float):
+    response = jsonify({"error": message})
+    response.status_code = status
+    response.headers["Retry-After"] = str(max(1, math.ceil(retry_after)))
+    return response
+
+
+def admission_controlled(limiter: RateLimiter, cost: Optional[Callable[[], int]] = None):
+    """Rate-limit a write endpoint and cap its concurrent writes.
+
+    ``cost`` returns how many tokens the current request spends (one by
+    default). Requests over budget are shed immediately with 429 or 503 and
+    a ``Retry-After`` header rather than queueing behind SQLite's writer lock.
+    """
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            tokens = cost() if cost else 1
+            if tokens > limiter.burst:
+                stats.incr(limiter.scope, "too_large")
+                response = jsonify({"error": f"At most {int(limiter.burst)} writes per request"})
+                response.status_code = 413
+                return response
+            # Take the write slot first so a 503 never spends client tokens.
+            slot = limiter.slots.try_acquire()
+            if slot is None:
+                stats.incr(limiter.scope, "overloaded")
+                return rejection("Server busy, retry shortly", 503, 1)
+            allowed, retry_after = limiter.try_acquire(client_keys(), tokens)
+            if not allowed:
+                limiter.slots.release(slot)
+                stats.incr(limiter.scope, "rate_limited")
+                return rejection("Too many requests", 429, retry_after)
+            stats.incr(limiter.scope, "admitted")
+            stats.track_write(limiter.scope, 1)
+            try:
+                return view(*args, **kwargs)
+            finally:
+                stats.track_write(limiter.scope, -1)
+                limiter.slots.release(slot)
+
+        return wrapper
+
+    return decorator
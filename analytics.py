@@ -0,0 +1,189 @@
+import argparse
+import json
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from models import get_connection
+from playbook import config_for_play
+
+ROLLUP_HIGH_WATER = "attempt_rollups.last_attempt_id"
+
+GROUP_COLUMNS = {"coverage_name", "base_coverage", "formation", "route_combo"}
+ORDER_EXPRESSIONS = {
+    "attempts": "SUM(attempts) DESC",
+    "avg_score": "SUM(score_sum) / SUM(attempts) DESC",
+    "completions": "SUM(completions) DESC",
+    "completion_rate": "CAST(SUM(completions) AS REAL) / SUM(attempts) DESC",
+}
+
+
+def route_combo_key(route_selections: Any) -> str:
+    if not isinstance(route_selections, dict):
+        return ""
+    return ",".join(f"{receiver}:{route}" for receiver, route in sorted(route_selections.items()))
+
+
+def rollup_row(row) -> Tuple[Any, ...]:
+    events = json.loads(row["events"])
+    event_types = {event.get("type") for event in events if isinstance(event, dict)}
+    # Dimensions come from the play that was actually served that day.
+    config = config_for_play(row["play_name"], row["play_date"])
+    return (
+        config.coverage,
+        config.coverage.split()[0],
+        config.formation,
+        route_combo_key(json.loads(row["route_selections"])),
+        row["score"],
+        int("complete" in event_types),
+        int("interception" in event_types),
+        int("sack" in event_types),
+    )
+
+
+def rollup_high_water() -> int:
+    with get_connection() as conn:
+        state = conn.execute("SELECT value FROM job_state WHERE name = ?", (ROLLUP_HIGH_WATER,)).fetchone()
+        return state["value"] if state else 0
+
+
+def refresh_rollups(batch_size: int = 1000) -> int:
+    """Fold attempts newer than the stored high-water mark into the rollups.
+
+    Each batch takes the write lock before reading the mark and commits
+    together with the advanced mark, so concurrent or interrupted runs
+    never double count.
+    """
+    processed = 0
+    conn = get_connection()
+    conn.isolation_level = None
+    try:
+        while True:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                state = conn.execute("SELECT value FROM job_state WHERE name = ?", (ROLLUP_HIGH_WATER,)).fetchone()
+                last_id = state["value"] if state else 0
+                rows = conn.execute(
+                    """
+                    SELECT id, play_name, play_date, route_selections, events, score
+                    FROM attempts WHERE id > ? ORDER BY id LIMIT ?
+                    """,
+                    (last_id, batch_size),
+                ).fetchall()
+                if rows:
+                    conn.executemany(
+                        """
+                        INSERT INTO attempt_rollups (
+                            coverage_name, base_coverage, formation, route_combo,
+                            attempts, score_sum, completions, interceptions, sacks
+                        )
+                        VALUES (?, ?, ?, ?, 1, ?, ?, ?, ?)
+                        ON CONFLICT(coverage_name, formation, route_combo) DO UPDATE SET
+                            attempts = attempts + 1,
+                            score_sum = score_sum + excluded.score_sum,
+                            completions = completions + excluded.completions,
+                            interceptions = interceptions + excluded.interceptions,
+                            sacks = sacks + excluded.sacks
+                        """,
+                        [rollup_row(row) for row in rows],
+                    )
+                    conn.execute(
+                        """
+                        INSERT INTO job_state (name, value) VALUES (?, ?)
+                        ON CONFLICT(name) DO UPDATE SET value = excluded.value
+                        """,
+                        (ROLLUP_HIGH_WATER, rows[-1]["id"]),
+                    )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            processed += len(rows)
+            if len(rows) < batch_size:
+                return processed
+    finally:
+        conn.close()
+
+
+def rebuild_rollups() -> None:
+    with get_connection() as conn:
+        conn.execute("DELETE FROM attempt_rollups")
+        conn.execute("DELETE FROM job_state WHERE name = ?", (ROLLUP_HIGH_WATER,))
+
+
+def query_rollups(
+    group_by: str = "route_combo",
+    coverage_name: Optional[str] = None,
+    base_coverage: Optional[str] = None,
+    formation: Optional[str] = None,
+    order_by: str = "completion_rate",
+    min_attempts: int = 1,
+    limit: int = 20,
+) -> List[Dict[str, Any]]:
+    if group_by not in GROUP_COLUMNS:
+        raise ValueError(f"group_by must be one of {', '.join(sorted(GROUP_COLUMNS))}")
+    if order_by not in ORDER_EXPRESSIONS:
+        raise ValueError(f"order_by must be one of {', '.join(sorted(ORDER_EXPRESSIONS))}")
+    if min_attempts < 1:
+        raise ValueError("min_attempts must be at least 1")
+
+    filters = []
+    params: List[Any] = []
+    for column, value in (
+        ("coverage_name", coverage_name),
+        ("base_coverage", base_coverage),
+        ("formation", formation),
+    ):
+        if value is not None:
+            filters.append(f"{column} = ?")
+            params.append(value)
+
+    query = f"""
+        SELECT {group_by} AS bucket,
+               SUM(attempts) AS attempts,
+               SUM(score_sum) AS score_sum,
+               SUM(completions) AS completions,
+               SUM(interceptions) AS interceptions,
+               SUM(sacks) AS sacks
+        FROM attempt_rollups
+    """
+    if filters:
+        query += " WHERE " + " AND ".join(filters)
+    query += f" GROUP BY {group_by} HAVING SUM(attempts) >= ? ORDER BY {ORDER_EXPRESSIONS[order_by]} LIMIT ?"
+    params.extend([min_attempts, limit])
+
+    with get_connection() as conn:
+        rows = conn.execute(query, params).fetchall()
+        return [
+            {
+                group_by: row["bucket"],
+                "attempts": row["attempts"],
+                "avg_score": round(row["score_sum"] / row["attempts"], 2),
+                "completions": row["completions"],
+                "interceptions": row["interceptions"],
+                "sacks": row["sacks"],
+                "completion_rate": round(row["completions"] / row["attempts"], 4),
+            }
+            for row in rows
+        ]
+
+
+def main() -> None:
+    from models import init_db
+
+    parser = argparse.ArgumentParser(description="Fold new attempts into the analytics rollups.")
+    parser.add_argument("--interval", type=float, default=0, help="keep running, refreshing every N seconds")
+    parser.add_argument("--rebuild", action="store_true", help="discard the rollups and recompute from scratch")
+    args = parser.parse_args()
+
+    init_db()
+    if args.rebuild:
+        rebuild_rollups()
+    while True:
+        print(f"Rolled up {refresh_rollups()} attempts")
+        if not args.interval:
+            return
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,41 @@
 import os
+from typing import Any, Dict, Optional
 from urllib.parse import quote_plus
 
 from authlib.integrations.flask_client import OAuth
 from dotenv import load_dotenv
 from flask import Flask, redirect, session, url_for
+from werkzeug.middleware.proxy_fix import ProxyFix
 
-from models import init_db, get_user_by_email, create_user
+import models
+from admission import share_write_slots
+from compression import init_compression
+from models import init_db, start_replica_refresher
+from profiling import init_profiling
 from routes import api
+from storage import create_storage
 
 
-def create_app() -> Flask:
+def create_app(config: Optional[Dict[str, Any]] = None) -> Flask:
     load_dotenv()
     app = Flask(__name__, static_folder="frontend", static_url_path="")
     app.secret_key = os.environ.get("SECRET_KEY", "dev-secret")
-    init_db()
+    trusted_proxies = int(os.environ.get("DAILYREAD_TRUSTED_PROXIES", "0"))
+    if trusted_proxies:
+        # Rate limiting keys on the client IP; trust X-Forwarded-For from this many proxy hops.
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=trusted_proxies, x_proto=trusted_proxies)
+    app.config["STORAGE_BACKEND"] = os.environ.get("DAILYREAD_STORAGE", "sqlite")
+    app.config.update(config or {})
+    storage = create_storage(app.config["STORAGE_BACKEND"])
+    app.extensions["dailyread.storage"] = storage
+    if app.config["STORAGE_BACKEND"] == "sqlite":
+        init_db()
+        start_replica_refresher()
+        # Every worker process shares one SQLite writer, so they share the write caps too.
+        share_write_slots(os.environ.get("DAILYREAD_WRITE_SLOT_DIR", f"{models.DB_PATH}.slots"))
     app.register_blueprint(api)
+    init_profiling(app)
+    init_compression(app)
 
     oauth = OAuth(app)
     google_client_id = os.environ.get("GOOGLE_CLIENT_ID")
@@ -60,9 +81,9 @@ def create_app() -> Flask:
         email = user_info.get("email")
         if not email:
             return redirect(f"/?auth_error={quote_plus('Google account email was not returned')}")
-        user = get_user_by_email(email)
+        user = storage.get_user_by_email(email)
         if not user:
-            user_id = create_user(email, None)
+            user_id = storage.create_user(email, None)
             user = {"id": user_id, "email": email}
         admin_emails = [
             email.strip().lower()
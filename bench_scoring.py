@@ -0,0 +1,68 @@
+"""Compare scalar and batch attempt scoring throughput.
+
+    python bench_scoring.py --attempts 200000 --repeat 5
+"""
+
+import argparse
+import random
+import time
+from typing import Any, Dict, List
+
+from playbook import flatten_events, score_attempt, score_attempts_batch
+
+
+def synthetic_attempts(count: int, seed: int) -> List[List[Dict[str, Any]]]:
+    rng = random.Random(seed)
+    attempts = []
+    for _ in range(count):
+        events = [{"t": 0.0, "type": "start", "payload": {}}]
+        roll = rng.random()
+        if roll < 0.18:
+            events.append({"t": 3.0, "type": "sack", "payload": {"reason": "pressure"}})
+        else:
+            separation = rng.gammavariate(3.0, 14.0)
+            outcome = "interception" if separation < 18 else "incomplete" if separation < 30 else "complete"
+            events.append({"t": 2.5, "type": "target", "payload": {"separation": f"{separation:.1f}"}})
+            events.append({"t": 2.5, "type": outcome, "payload": {}})
+        attempts.append(events)
+    return attempts
+
+
+def best_of(repeat: int, run) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--attempts", type=int, default=200000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    attempts = synthetic_attempts(args.attempts, args.seed)
+    columns = flatten_events(attempts)
+    scalar = [score_attempt(events) for events in attempts]
+    batch = score_attempts_batch(*columns, len(attempts))
+    if batch.tolist() != scalar:
+        raise SystemExit("Batch scores differ from score_attempt")
+
+    results = {
+        "scalar score_attempt": best_of(args.repeat, lambda: [score_attempt(events) for events in attempts]),
+        "flatten_events": best_of(args.repeat, lambda: flatten_events(attempts)),
+        "score_attempts_batch": best_of(args.repeat, lambda: score_attempts_batch(*columns, len(attempts))),
+        "flatten + batch": best_of(
+            args.repeat, lambda: score_attempts_batch(*flatten_events(attempts), len(attempts))
+        ),
+    }
+    print(f"{len(attempts)} attempts, best of {args.repeat}")
+    for name, seconds in results.items():
+        print(f"  {name:<22} {seconds * 1000:9.1f} ms  {len(attempts) / seconds:>14,.0f} attempts/s")
+
+
+if __name__ == "__main__":
+    main()
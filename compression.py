@@ -0,0 +1,47 @@
+import gzip
+import os
+from typing import Optional
+
+from flask import Flask, request
+
+COMPRESS_MIN_BYTES = int(os.environ.get("DAILYREAD_COMPRESS_MIN_BYTES", "1024"))
+COMPRESS_LEVEL = 6
+COMPRESSIBLE_MIMETYPES = {"application/json"}
+
+
+def accepts_gzip() -> bool:
+    return bool(request.accept_encodings["gzip"])
+
+
+def gzip_body(body: bytes) -> Optional[bytes]:
+    """Return ``body`` gzipped, or None if it is too small to be worth it."""
+    if len(body) < COMPRESS_MIN_BYTES:
+        return None
+    return gzip.compress(body, compresslevel=COMPRESS_LEVEL)
+
+
+def compress_response(response):
+    """Gzip large JSON bodies for clients that advertise gzip support.
+
+    Views that cache their own compressed body set ``Content-Encoding``
+    themselves and are passed through untouched.
+    """
+    response.vary.add("Accept-Encoding")
+    if (
+        response.status_code != 200
+        or response.direct_passthrough
+        or response.mimetype not in COMPRESSIBLE_MIMETYPES
+        or "Content-Encoding" in response.headers
+        or not accepts_gzip()
+    ):
+        return response
+    compressed = gzip_body(response.get_data())
+    if compressed is None:
+        return response
+    response.set_data(compressed)
+    response.headers["Content-Encoding"] = "gzip"
+    return response
+
+
+def init_compression(app: Flask) -> None:
+    app.after_request(compress_response)
@@ -239,10 +239,11 @@ async function submitAttempt() {
     play_date: play.play_date,
     route_selections: simulation.routeSelections,
     events: simulation.events,
+    idempotency_key: crypto.randomUUID(),
   };
   const response = await fetch("/api/attempts", {
     method: "POST",
-    headers: { "Content-Type": "application/json" },
+    headers: { "Content-Type": "application/json", "Idempotency-Key": payload.idempotency_key },
     body: JSON.stringify(payload),
   });
   if (!response.ok) {
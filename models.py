@@ -1,11 +1,23 @@
 import json
+import logging
 import os
 import sqlite3
+import threading
+import time
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 DB_PATH = os.environ.get("DAILYREAD_DB", os.path.join(os.getcwd(), "dailyread.db"))
 
+REPLICA_ENABLED = os.environ.get("DAILYREAD_REPLICA", "") == "1"
+REPLICA_PATH = os.environ.get("DAILYREAD_REPLICA_DB", f"{DB_PATH}.replica")
+REPLICA_REFRESH_SECONDS = float(os.environ.get("DAILYREAD_REPLICA_REFRESH_SECONDS", "10"))
+REPLICA_MAX_STALENESS_SECONDS = float(os.environ.get("DAILYREAD_REPLICA_MAX_STALENESS_SECONDS", "30"))
+REPLICA_LOCK_STALE_SECONDS = max(60.0, REPLICA_REFRESH_SECONDS * 6)
+
+logger = logging.getLogger(__name__)
+
 
 def get_connection() -> sqlite3.Connection:
     conn = sqlite3.connect(DB_PATH)
@@ -13,8 +25,101 @@ def get_connection() -> sqlite3.Connection:
     return conn
 
 
+def replica_age() -> Optional[float]:
+    try:
+        return time.time() - os.path.getmtime(REPLICA_PATH)
+    except OSError:
+        return None
+
+
+def get_read_connection() -> sqlite3.Connection:
+    """Connection for read-only queries that tolerate bounded staleness.
+
+    Uses the snapshot replica when replica mode is on and the snapshot is
+    within the staleness bound, otherwise falls back to the primary.
+    """
+    if REPLICA_ENABLED:
+        age = replica_age()
+        if age is not None and age <= REPLICA_MAX_STALENESS_SECONDS:
+            conn = sqlite3.connect(f"{Path(REPLICA_PATH).resolve().as_uri()}?mode=ro", uri=True)
+            conn.row_factory = sqlite3.Row
+            return conn
+    return get_connection()
+
+
+def refresh_replica() -> None:
+    # Copy into a scratch file and swap it in, so readers holding the old
+    # snapshot open are never blocked. The copy is a single backup step: a
+    # stepwise backup restarts whenever another connection writes, and would
+    # never finish under steady attempt traffic. The primary runs in WAL
+    # mode in replica mode, so this read does not block writers.
+    scratch_path = f"{REPLICA_PATH}.{os.getpid()}.tmp"
+    source = get_connection()
+    target = sqlite3.connect(scratch_path)
+    try:
+        source.backup(target, pages=-1)
+        # Readers open the snapshot read-only, which a WAL-mode file does not allow.
+        target.execute("PRAGMA journal_mode = DELETE")
+    finally:
+        target.close()
+        source.close()
+    os.replace(scratch_path, REPLICA_PATH)
+
+
+def claim_replica_refresh() -> bool:
+    """Take the cross-process refresh lock so one worker copies per interval."""
+    lock_path = f"{REPLICA_PATH}.lock"
+    try:
+        if time.time() - os.path.getmtime(lock_path) > REPLICA_LOCK_STALE_SECONDS:
+            # Left behind by a worker that died mid-copy.
+            os.remove(lock_path)
+    except OSError:
+        pass
+    try:
+        os.close(os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+    except FileExistsError:
+        return False
+    return True
+
+
+def release_replica_refresh() -> None:
+    try:
+        os.remove(f"{REPLICA_PATH}.lock")
+    except FileNotFoundError:
+        pass
+
+
+def start_replica_refresher() -> Optional[threading.Thread]:
+    if not REPLICA_ENABLED:
+        return None
+
+    def run() -> None:
+        while True:
+            age = replica_age()
+            if (age is None or age >= REPLICA_REFRESH_SECONDS) and claim_replica_refresh():
+                try:
+                    # Another worker may have refreshed while we waited for the lock.
+                    age = replica_age()
+                    if age is None or age >= REPLICA_REFRESH_SECONDS:
+                        refresh_replica()
+                except sqlite3.Error:
+                    logger.exception("Replica refresh failed")
+                finally:
+                    release_replica_refresh()
+            time.sleep(REPLICA_REFRESH_SECONDS / 2)
+
+    thread = threading.Thread(target=run, name="replica-refresher", daemon=True)
+    thread.start()
+    return thread
+
+
 def init_db() -> None:
     with get_connection() as conn:
+        # Only takes effect on a new, empty database; see retention.py.
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        if REPLICA_ENABLED:
+            # Lets the snapshot copy read the primary without blocking writers.
+            conn.execute("PRAGMA journal_mode = WAL")
         conn.execute(
             """
             CREATE TABLE IF NOT EXISTS users (
@@ -36,10 +141,61 @@ def init_db() -> None:
                 events TEXT NOT NULL,
                 score REAL NOT NULL,
                 coverage_name TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                idempotency_key TEXT,
+                events_compacted INTEGER NOT NULL DEFAULT 0
+            )
+            """
+        )
+        attempt_columns = {row["name"] for row in conn.execute("PRAGMA table_info(attempts)")}
+        if "idempotency_key" not in attempt_columns:
+            conn.execute("ALTER TABLE attempts ADD COLUMN idempotency_key TEXT")
+        if "events_compacted" not in attempt_columns:
+            conn.execute("ALTER TABLE attempts ADD COLUMN events_compacted INTEGER NOT NULL DEFAULT 0")
+        # Keys are scoped to their owner; anonymous attempts share owner 0.
+        conn.execute(
+            """
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_attempts_owner_idempotency_key
+            ON attempts (IFNULL(user_id, 0), idempotency_key)
+            """
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS scheduled_plays (
+                play_date TEXT PRIMARY KEY,
+                play_name TEXT NOT NULL,
+                coverage_name TEXT NOT NULL,
+                play_json TEXT NOT NULL,
                 created_at TEXT NOT NULL
             )
             """
         )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS attempt_rollups (
+                coverage_name TEXT NOT NULL,
+                base_coverage TEXT NOT NULL,
+                formation TEXT NOT NULL,
+                route_combo TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                score_sum REAL NOT NULL DEFAULT 0,
+                completions INTEGER NOT NULL DEFAULT 0,
+                interceptions INTEGER NOT NULL DEFAULT 0,
+                sacks INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (coverage_name, formation, route_combo)
+            )
+            """
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_attempt_rollups_base ON attempt_rollups (base_coverage)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_attempt_rollups_formation ON attempt_rollups (formation)")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS job_state (
+                name TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            )
+            """
+        )
 
 
 def create_user(email: str, password_hash: Optional[str]) -> int:
@@ -68,6 +224,41 @@ def get_user_by_id(user_id: int) -> Optional[Dict[str, Any]]:
         return dict(row)
 
 
+ATTEMPT_FIELDS = (
+    "id",
+    "user_id",
+    "play_name",
+    "play_date",
+    "route_selections",
+    "events",
+    "score",
+    "coverage_name",
+    "created_at",
+)
+JSON_ATTEMPT_FIELDS = {"route_selections", "events"}
+
+
+def attempt_from_row(row: sqlite3.Row) -> Dict[str, Any]:
+    return {
+        key: json.loads(row[key]) if key in JSON_ATTEMPT_FIELDS else row[key]
+        for key in row.keys()
+    }
+
+
+def get_attempt_by_idempotency_key(user_id: Optional[int], idempotency_key: str) -> Optional[Dict[str, Any]]:
+    with get_connection() as conn:
+        row = conn.execute(
+            f"""
+            SELECT {', '.join(ATTEMPT_FIELDS)} FROM attempts
+            WHERE IFNULL(user_id, 0) = ? AND idempotency_key = ?
+            """,
+            (user_id or 0, idempotency_key),
+        ).fetchone()
+        if not row:
+            return None
+        return attempt_from_row(row)
+
+
 def store_attempt(
     user_id: Optional[int],
     play_name: str,
@@ -76,28 +267,45 @@ def store_attempt(
     events: List[Dict[str, Any]],
     score: float,
     coverage_name: str,
-) -> Dict[str, Any]:
+    idempotency_key: Optional[str] = None,
+) -> Tuple[Dict[str, Any], bool]:
+    """Insert an attempt, returning ``(attempt, created)``.
+
+    If the owner already stored an attempt under ``idempotency_key``, that
+    attempt is returned with ``created`` False.
+    """
     now_iso = datetime.now(timezone.utc).isoformat()
-    with get_connection() as conn:
-        cursor = conn.execute(
-            """
-            INSERT INTO attempts (user_id, play_name, play_date, route_selections, events, score, coverage_name, created_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (
-                user_id,
-                play_name,
-                play_date,
-                json.dumps(route_selections),
-                json.dumps(events),
-                score,
-                coverage_name,
-                now_iso,
-            ),
-        )
-        attempt_id = cursor.lastrowid
+    try:
+        with get_connection() as conn:
+            cursor = conn.execute(
+                """
+                INSERT INTO attempts (
+                    user_id, play_name, play_date, route_selections, events, score, coverage_name, created_at,
+                    idempotency_key
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    user_id,
+                    play_name,
+                    play_date,
+                    json.dumps(route_selections),
+                    json.dumps(events),
+                    score,
+                    coverage_name,
+                    now_iso,
+                    idempotency_key,
+                ),
+            )
+            attempt_id = cursor.lastrowid
+    except sqlite3.IntegrityError:
+        # A concurrent retry with the same key won the insert; hand back its row.
+        existing = get_attempt_by_idempotency_key(user_id, idempotency_key) if idempotency_key else None
+        if existing is None:
+            raise
+        return existing, False
 
-    return {
+    attempt = {
         "id": attempt_id,
         "user_id": user_id,
         "play_name": play_name,
@@ -108,29 +316,73 @@ def store_attempt(
         "coverage_name": coverage_name,
         "created_at": now_iso,
     }
+    return attempt, True
 
 
-def list_attempts(user_id: Optional[int] = None) -> List[Dict[str, Any]]:
-    query = "SELECT * FROM attempts"
+def list_attempts(user_id: Optional[int] = None, fields: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+    """List attempts newest first, optionally projecting to a subset of ``ATTEMPT_FIELDS``.
+
+    Unrequested columns are neither read nor JSON-decoded.
+    """
+    columns = [field for field in ATTEMPT_FIELDS if field in fields] if fields else list(ATTEMPT_FIELDS)
+    query = f"SELECT {', '.join(columns)} FROM attempts"
     params: List[Any] = []
     if user_id is not None:
         query += " WHERE user_id = ?"
         params.append(user_id)
-    query += " ORDER BY created_at DESC"
+    query += " ORDER BY created_at DESC, id DESC"
+
+    with get_read_connection() as conn:
+        rows = conn.execute(query, params).fetchall()
+        return [attempt_from_row(row) for row in rows]
+
+
+def schedule_play(play_date: str, play_name: str, coverage_name: str, play_json: str) -> Dict[str, Any]:
+    now_iso = datetime.now(timezone.utc).isoformat()
+    with get_connection() as conn:
+        conn.execute(
+            """
+            INSERT INTO scheduled_plays (play_date, play_name, coverage_name, play_json, created_at)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(play_date) DO UPDATE SET
+                play_name = excluded.play_name,
+                coverage_name = excluded.coverage_name,
+                play_json = excluded.play_json,
+                created_at = excluded.created_at
+            """,
+            (play_date, play_name, coverage_name, play_json, now_iso),
+        )
+
+    return {
+        "play_date": play_date,
+        "play_name": play_name,
+        "coverage_name": coverage_name,
+        "created_at": now_iso,
+    }
+
+
+def get_scheduled_play(play_date: str) -> Optional[Dict[str, Any]]:
+    with get_connection() as conn:
+        row = conn.execute("SELECT * FROM scheduled_plays WHERE play_date = ?", (play_date,)).fetchone()
+        if not row:
+            return None
+        return dict(row)
+
+
+def list_scheduled_plays(from_date: Optional[str] = None) -> List[Dict[str, Any]]:
+    query = "SELECT play_date, play_name, coverage_name, created_at FROM scheduled_plays"
+    params: List[Any] = []
+    if from_date is not None:
+        query += " WHERE play_date >= ?"
+        params.append(from_date)
+    query += " ORDER BY play_date ASC"
 
     with get_connection() as conn:
         rows = conn.execute(query, params).fetchall()
-        return [
-            {
-                "id": row["id"],
-                "user_id": row["user_id"],
-                "play_name": row["play_name"],
-                "play_date": row["play_date"],
-                "route_selections": json.loads(row["route_selections"]),
-                "events": json.loads(row["events"]),
-                "score": row["score"],
-                "coverage_name": row["coverage_name"],
-                "created_at": row["created_at"],
-            }
-            for row in rows
-        ]
+        return [dict(row) for row in rows]
+
+
+def delete_scheduled_play(play_date: str) -> bool:
+    with get_connection() as conn:
+        cursor = conn.execute("DELETE FROM scheduled_plays WHERE play_date = ?", (play_date,))
+        return cursor.rowcount > 0
@@ -2,9 +2,11 @@ import hashlib
 import math
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Dict, List, Tuple
+from typing import Dict, List, Sequence, Tuple
 from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
+import numpy as np
+
 OFFENSE_COLOR = "#1d4ed8"
 DEFENSE_COLOR = "#dc2626"
 QB_COLOR = "#facc15"
@@ -151,14 +153,17 @@ class PlayConfig:
     seed: int
 
 
+def seed_for_date(date_key: str) -> int:
+    return int(hashlib.sha256(date_key.encode()).hexdigest(), 16) % (2**32)
+
+
 def seed_for_today() -> int:
     try:
         tz = ZoneInfo("America/New_York")
         now = datetime.now(tz)
     except ZoneInfoNotFoundError:
         now = datetime.utcnow()
-    date_key = now.strftime("%Y-%m-%d")
-    return int(hashlib.sha256(date_key.encode()).hexdigest(), 16) % (2**32)
+    return seed_for_date(now.strftime("%Y-%m-%d"))
 
 
 def seed_from_name(play_name: str) -> int:
@@ -175,6 +180,24 @@ def generate_play_name(seed: int) -> PlayConfig:
     return PlayConfig(name=name, formation=f"{formation} {subset}", formation_tag=tag, coverage=coverage, seed=seed)
 
 
+def config_for_name(play_name: str) -> PlayConfig:
+    config = generate_play_name(seed_from_name(play_name))
+    config.name = play_name
+    return config
+
+
+def config_for_play(play_name: str, play_date: str) -> PlayConfig:
+    """Config of the play served under ``play_name`` on ``play_date``.
+
+    The date's default play is seeded from the date; any other name is a
+    scheduled or override play, which is seeded from its name.
+    """
+    config = generate_play_name(seed_for_date(play_date))
+    if config.name == play_name:
+        return config
+    return config_for_name(play_name)
+
+
 def formation_layout(formation: str, tag: str) -> Dict[str, Tuple[float, float]]:
     center_x = 450
     qb_y = 550
@@ -374,3 +397,83 @@ def score_attempt(events: List[Dict[str, any]]) -> float:
             separation = max(separation, float(event.get("payload", {}).get("separation", 0)))
     score += min(200, separation * 40)
     return max(0, min(1000, round(score, 2)))
+
+
+EVENT_OTHER = 0
+EVENT_COMPLETE = 1
+EVENT_INTERCEPTION = 2
+EVENT_SACK = 3
+EVENT_TARGET = 4
+
+EVENT_TYPE_CODES = {
+    "complete": EVENT_COMPLETE,
+    "interception": EVENT_INTERCEPTION,
+    "sack": EVENT_SACK,
+    "target": EVENT_TARGET,
+}
+
+
+def flatten_events(attempts: Sequence[List[Dict[str, any]]]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Flatten many attempts' events into ``(attempt_index, type_code, separation)`` columns."""
+    attempt_index = []
+    type_codes = []
+    separations = []
+    for index, events in enumerate(attempts):
+        for event in events:
+            code = EVENT_TYPE_CODES.get(event.get("type"), EVENT_OTHER)
+            attempt_index.append(index)
+            type_codes.append(code)
+            separations.append(float(event.get("payload", {}).get("separation", 0)) if code == EVENT_TARGET else 0.0)
+    return (
+        np.array(attempt_index, dtype=np.int64),
+        np.array(type_codes, dtype=np.int8),
+        np.array(separations, dtype=np.float64),
+    )
+
+
+def score_attempts_batch(
+    attempt_index: np.ndarray, type_codes: np.ndarray, separations: np.ndarray, attempt_count: int
+) -> np.ndarray:
+    """Score many attempts at once from flattened event columns.
+
+    Produces exactly the values ``score_attempt`` would for each attempt,
+    including Python's correctly rounded ``round(score, 2)``.
+    """
+    outcomes = np.zeros((4, attempt_count), dtype=bool)
+    for row, code in enumerate((EVENT_COMPLETE, EVENT_INTERCEPTION, EVENT_SACK)):
+        outcomes[row, attempt_index[type_codes == code]] = True
+    is_target = type_codes == EVENT_TARGET
+    separation = np.zeros(attempt_count, dtype=np.float64)
+    # fmax skips NaN the same way max(separation, nan) keeps the running value.
+    np.fmax.at(separation, attempt_index[is_target], separations[is_target])
+
+    score = 200.0 + 400.0 * outcomes[0] - 350.0 * outcomes[1] - 150.0 * outcomes[2]
+    score = score + np.minimum(200.0, separation * 40.0)
+
+    # np.round scales by 100 and can land on the wrong side of a tie; recheck
+    # those few values with Python's round so results match score_attempt.
+    scaled = score * 100.0
+    rounded = np.rint(scaled) / 100.0
+    near_tie = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    for index in np.flatnonzero(near_tie):
+        rounded[index] = round(float(score[index]), 2)
+    return np.clip(rounded, 0, 1000)
+
+
+def compact_events(events: List[Dict[str, any]]) -> List[Dict[str, any]]:
+    """Reduce an event stream to the events ``score_attempt`` reads.
+
+    Keeps one marker per outcome type and a single target carrying the max
+    separation, so the compacted list scores identically to the original.
+    """
+    types = {event.get("type") for event in events}
+    compacted = [{"type": "compacted", "payload": {"event_count": len(events)}}]
+    for event_type in ("complete", "interception", "sack"):
+        if event_type in types:
+            compacted.append({"type": event_type, "payload": {}})
+    separations = [
+        float(event.get("payload", {}).get("separation", 0)) for event in events if event.get("type") == "target"
+    ]
+    if separations:
+        compacted.append({"type": "target", "payload": {"separation": max(separations)}})
+    return compacted
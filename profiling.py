@@ -0,0 +1,157 @@
+import cProfile
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+from flask import Flask, g, request, session
+
+PROFILE_DIR = os.environ.get("DAILYREAD_PROFILE_DIR", os.path.join(os.getcwd(), "profiles"))
+PROFILE_FORMAT = os.environ.get("DAILYREAD_PROFILE_FORMAT", "pstats")
+PROFILE_KEEP = int(os.environ.get("DAILYREAD_PROFILE_KEEP", "50"))
+PROFILE_SAMPLE_RATE = int(os.environ.get("DAILYREAD_PROFILE_SAMPLE_RATE", "0"))
+PROFILE_HEADER = "X-Dailyread-Profile"
+
+PROFILE_SUFFIXES = (".pstats", ".collapsed")
+
+logger = logging.getLogger(__name__)
+
+# Python 3.12+ allows only one active profiler per process, so concurrent
+# candidates are skipped rather than failing the request.
+_active_profile = threading.Lock()
+
+
+class StackProfiler:
+    """Deterministic profiler that records self time per call stack.
+
+    The output is the collapsed-stack format (``a;b;c <microseconds>``)
+    consumed by flamegraph.pl and speedscope.
+    """
+
+    def __init__(self):
+        self.totals: Dict[str, float] = defaultdict(float)
+        self._stack: List[List[Any]] = []
+
+    def _label(self, frame, event: str, arg) -> str:
+        if event.startswith("c_"):
+            module = getattr(arg, "__module__", None) or "builtins"
+            return f"{module}.{getattr(arg, '__qualname__', repr(arg))}"
+        code = frame.f_code
+        return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+    def _trace(self, frame, event: str, arg) -> None:
+        now = time.perf_counter()
+        if event in ("call", "c_call"):
+            self._stack.append([self._label(frame, event, arg), now, 0.0])
+        elif self._stack:
+            label, started, child_time = self._stack.pop()
+            elapsed = now - started
+            path = ";".join(entry[0] for entry in self._stack)
+            self.totals[f"{path};{label}" if path else label] += elapsed - child_time
+            if self._stack:
+                self._stack[-1][2] += elapsed
+
+    def enable(self) -> None:
+        sys.setprofile(self._trace)
+
+    def disable(self) -> None:
+        sys.setprofile(None)
+
+    def dump_stats(self, path: str) -> None:
+        with open(path, "w") as handle:
+            for stack, seconds in sorted(self.totals.items()):
+                micros = int(seconds * 1_000_000)
+                if micros:
+                    handle.write(f"{stack} {micros}\n")
+
+
+def should_profile() -> bool:
+    if request.headers.get(PROFILE_HEADER) and session.get("is_admin"):
+        return True
+    return PROFILE_SAMPLE_RATE > 0 and random.randrange(PROFILE_SAMPLE_RATE) == 0
+
+
+def start_profile() -> None:
+    if not should_profile() or not _active_profile.acquire(blocking=False):
+        return
+    profiler = StackProfiler() if PROFILE_FORMAT == "collapsed" else cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Another tool already owns the interpreter's profiling hook.
+        _active_profile.release()
+        return
+    g.profiler = profiler
+    g.profile_started = time.perf_counter()
+
+
+def finish_profile(response):
+    profiler = g.pop("profiler", None)
+    if profiler is None:
+        return response
+    profiler.disable()
+    try:
+        elapsed_ms = int((time.perf_counter() - g.pop("profile_started")) * 1000)
+        endpoint = re.sub(r"[^A-Za-z0-9_.-]", "_", request.endpoint or "unknown")
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+        suffix = ".collapsed" if isinstance(profiler, StackProfiler) else ".pstats"
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        profiler.dump_stats(os.path.join(PROFILE_DIR, f"{stamp}-{request.method}-{endpoint}-{elapsed_ms}ms{suffix}"))
+        rotate_profiles()
+    except OSError:
+        # A full or read-only disk loses the profile, not the response.
+        logger.exception("Could not save request profile")
+    finally:
+        _active_profile.release()
+    return response
+
+
+def abandon_profile(exc) -> None:
+    # Safety net: if finish_profile never ran or another after_request hook
+    # failed first, still stop the profiler and free the slot.
+    profiler = g.pop("profiler", None)
+    if profiler is not None:
+        profiler.disable()
+        _active_profile.release()
+
+
+def list_profiles() -> List[Dict[str, Any]]:
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    profiles = []
+    for entry in os.scandir(PROFILE_DIR):
+        if entry.is_file() and entry.name.endswith(PROFILE_SUFFIXES):
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                # Rotated away by another worker process.
+                continue
+            profiles.append(
+                {
+                    "name": entry.name,
+                    "size": stat.st_size,
+                    "created_at": datetime.fromtimestamp(stat.st_mtime, timezone.utc).isoformat(),
+                }
+            )
+    profiles.sort(key=lambda profile: profile["name"], reverse=True)
+    return profiles
+
+
+def rotate_profiles() -> None:
+    for profile in list_profiles()[PROFILE_KEEP:]:
+        try:
+            os.remove(os.path.join(PROFILE_DIR, profile["name"]))
+        except FileNotFoundError:
+            pass
+
+
+def init_profiling(app: Flask) -> None:
+    app.before_request(start_profile)
+    app.after_request(finish_profile)
+    app.teardown_request(abandon_profile)
@@ -0,0 +1,115 @@
+"""Compact the event streams of old attempts and reclaim the freed space.
+
+    python retention.py --days 90
+"""
+
+import argparse
+import json
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict
+
+from models import get_connection, init_db
+from playbook import compact_events
+
+AUTO_VACUUM_INCREMENTAL = 2
+
+
+def database_bytes(conn) -> int:
+    page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+    page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+    return page_size * page_count
+
+
+def compact_old_attempts(older_than_days: int, chunk_size: int = 500, pause_seconds: float = 0.0) -> Dict[str, int]:
+    """Replace full event lists older than the cutoff with ``compact_events`` summaries.
+
+    Each chunk is its own short transaction so the writer lock is released
+    between chunks and live attempt submissions are not held up.
+    """
+    cutoff = (datetime.now(timezone.utc) - timedelta(days=older_than_days)).isoformat()
+    last_id = 0
+    compacted = 0
+    bytes_before = 0
+    bytes_after = 0
+    while True:
+        with get_connection() as conn:
+            rows = conn.execute(
+                """
+                SELECT id, events FROM attempts
+                WHERE id > ? AND events_compacted = 0 AND created_at < ?
+                ORDER BY id LIMIT ?
+                """,
+                (last_id, cutoff, chunk_size),
+            ).fetchall()
+            if not rows:
+                break
+            updates = []
+            for row in rows:
+                summary = json.dumps(compact_events(json.loads(row["events"])))
+                bytes_before += len(row["events"])
+                bytes_after += len(summary)
+                updates.append((summary, row["id"]))
+            conn.executemany("UPDATE attempts SET events = ?, events_compacted = 1 WHERE id = ?", updates)
+        compacted += len(rows)
+        last_id = rows[-1]["id"]
+        if pause_seconds:
+            time.sleep(pause_seconds)
+    return {"attempts_compacted": compacted, "event_bytes_before": bytes_before, "event_bytes_after": bytes_after}
+
+
+def reclaim_space(full_vacuum: bool = False) -> Dict[str, int]:
+    conn = get_connection()
+    conn.isolation_level = None
+    try:
+        size_before = database_bytes(conn)
+        free_pages = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        if full_vacuum:
+            # Rewrites the whole file: repacks pages that compaction left
+            # half-empty and switches older databases to incremental mode.
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            conn.execute("VACUUM")
+        elif conn.execute("PRAGMA auto_vacuum").fetchone()[0] == AUTO_VACUUM_INCREMENTAL:
+            conn.execute("PRAGMA incremental_vacuum")
+        return {
+            "free_pages": free_pages,
+            "auto_vacuum": conn.execute("PRAGMA auto_vacuum").fetchone()[0],
+            "file_bytes_before": size_before,
+            "file_bytes_after": database_bytes(conn),
+        }
+    finally:
+        conn.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--days", type=int, default=90, help="compact attempts older than this many days")
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--pause", type=float, default=0.05, help="seconds to sleep between chunks")
+    parser.add_argument(
+        "--full-vacuum",
+        action="store_true",
+        help="run a blocking VACUUM to repack the file and enable incremental vacuum",
+    )
+    args = parser.parse_args()
+
+    init_db()
+    result = compact_old_attempts(args.days, args.chunk_size, args.pause)
+    result.update(reclaim_space(args.full_vacuum))
+    print(f"Compacted {result['attempts_compacted']} attempts")
+    print(f"Event data: {result['event_bytes_before']} -> {result['event_bytes_after']} bytes")
+    print(
+        f"Database file: {result['file_bytes_before']} -> {result['file_bytes_after']} bytes "
+        f"({result['file_bytes_before'] - result['file_bytes_after']} reclaimed)"
+    )
+    if result["auto_vacuum"] != AUTO_VACUUM_INCREMENTAL:
+        print("Incremental vacuum is not enabled on this database; rerun with --full-vacuum to enable it.")
+    elif not args.full_vacuum:
+        print(
+            f"Incremental vacuum released {result['free_pages']} free pages. Shrunken rows stay on partially "
+            "filled pages until a --full-vacuum run repacks them."
+        )
+
+
+if __name__ == "__main__":
+    main()
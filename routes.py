@@ -1,39 +1,113 @@
+import json
+import time
 from datetime import datetime
+from typing import Dict, Optional, Tuple
 from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
-from flask import Blueprint, jsonify, request, session
+from flask import Blueprint, current_app, jsonify, request, send_from_directory, session
 from werkzeug.security import check_password_hash, generate_password_hash
 
-from models import (
-    create_user,
-    get_user_by_email,
-    get_user_by_id,
-    init_db,
-    list_attempts,
-    store_attempt,
-)
+from admission import admission_controlled, attempt_limiter, auth_limiter
+from admission import stats as admission_stats
+from analytics import query_rollups, rollup_high_water
+from compression import accepts_gzip, gzip_body
+from models import ATTEMPT_FIELDS
 from playbook import (
+    PlayConfig,
     build_play,
+    config_for_name,
+    config_for_play,
     generate_play_name,
     score_attempt,
-    seed_for_today,
-    seed_from_name,
+    seed_for_date,
 )
+from profiling import PROFILE_DIR, PROFILE_SUFFIXES, list_profiles
+from storage import StorageBackend
 
 api = Blueprint("api", __name__, url_prefix="/api")
 
+# Serialized play JSON keyed by ET date, held per app. Entries expire so
+# that schedule changes made through another worker process are picked up.
+PLAY_CACHE_SECONDS = 60
+
+
+def storage() -> StorageBackend:
+    return current_app.extensions["dailyread.storage"]
+
+
+def play_cache() -> Dict[str, Tuple[float, bytes, Optional[bytes]]]:
+    return current_app.extensions.setdefault("dailyread.play_cache", {})
+
 
 def current_user():
     user_id = session.get("user_id")
     if not user_id:
         return None
-    return get_user_by_id(user_id)
+    return storage().get_user_by_id(user_id)
 
 
 def is_admin() -> bool:
     return bool(session.get("is_admin"))
 
 
+def today_et() -> str:
+    try:
+        tz = ZoneInfo("America/New_York")
+        return datetime.now(tz).strftime("%Y-%m-%d")
+    except ZoneInfoNotFoundError:
+        return datetime.utcnow().strftime("%Y-%m-%d")
+
+
+def normalize_play_date(play_date) -> Optional[str]:
+    """Return ``play_date`` as a zero-padded YYYY-MM-DD key, or None if invalid."""
+    try:
+        return datetime.strptime(play_date, "%Y-%m-%d").strftime("%Y-%m-%d")
+    except (TypeError, ValueError):
+        return None
+
+
+def is_play_name(value) -> bool:
+    return isinstance(value, str) and bool(value.strip())
+
+
+def serialize_play(config: PlayConfig, play_date: str) -> str:
+    play = build_play(config.name, config.seed, config)
+    play.pop("coverage", None)
+    play["play_date"] = play_date
+    return json.dumps(play, separators=(",", ":"))
+
+
+def play_body_for_date(play_date: str) -> Tuple[bytes, Optional[bytes]]:
+    """Return the play JSON for ``play_date`` and its gzipped form, if large enough.
+
+    Both are cached together so every hit is served without re-encoding.
+    """
+    cache = play_cache()
+    cached = cache.get(play_date)
+    if cached and cached[0] > time.monotonic():
+        return cached[1], cached[2]
+
+    scheduled = storage().get_scheduled_play(play_date)
+    if scheduled:
+        play_json = scheduled["play_json"]
+    else:
+        config = generate_play_name(seed_for_date(play_date))
+        play_json = serialize_play(config, play_date)
+
+    body = play_json.encode()
+    gzipped = gzip_body(body)
+    cache.clear()
+    cache[play_date] = (time.monotonic() + PLAY_CACHE_SECONDS, body, gzipped)
+    return body, gzipped
+
+
+def store_schedule(play_date: str, play_name: str):
+    config = config_for_name(play_name)
+    stored = storage().schedule_play(play_date, play_name, config.coverage, serialize_play(config, play_date))
+    play_cache().pop(play_date, None)
+    return stored
+
+
 @api.get("/health")
 def health():
     return jsonify({"status": "ok"})
@@ -48,30 +122,32 @@ def me():
 
 
 @api.post("/auth/register")
+@admission_controlled(auth_limiter)
 def register():
     payload = request.get_json(silent=True) or {}
     email = payload.get("email")
     password = payload.get("password")
     if not email or not password:
         return jsonify({"error": "Email and password required"}), 400
-    if get_user_by_email(email):
+    if storage().get_user_by_email(email):
         return jsonify({"error": "Email already exists"}), 400
 
     password_hash = generate_password_hash(password)
-    user_id = create_user(email, password_hash)
+    user_id = storage().create_user(email, password_hash)
     session["user_id"] = user_id
     session["is_admin"] = False
     return jsonify({"status": "registered"})
 
 
 @api.post("/auth/login")
+@admission_controlled(auth_limiter)
 def login():
     payload = request.get_json(silent=True) or {}
     email = payload.get("email")
     password = payload.get("password")
     if not email or not password:
         return jsonify({"error": "Email and password required"}), 400
-    user = get_user_by_email(email)
+    user = storage().get_user_by_email(email)
     if not user or not user.get("password_hash"):
         return jsonify({"error": "Invalid credentials"}), 401
     if not check_password_hash(user["password_hash"], password):
@@ -89,63 +165,135 @@ def logout():
 
 @api.get("/play/today")
 def play_today():
-    try:
-        tz = ZoneInfo("America/New_York")
-        today = datetime.now(tz).strftime("%Y-%m-%d")
-    except ZoneInfoNotFoundError:
-        today = datetime.utcnow().strftime("%Y-%m-%d")
-    override_name = session.get("override_play")
-    if override_name:
-        seed = seed_from_name(override_name)
-        config = generate_play_name(seed)
-        config.name = override_name
-    else:
-        seed = seed_for_today()
-        config = generate_play_name(seed)
-    play = build_play(config.name, seed, config)
-    play.pop("coverage", None)
-    play["play_date"] = today
-    return jsonify(play)
+    body, gzipped = play_body_for_date(today_et())
+    if gzipped is not None and accepts_gzip():
+        response = current_app.response_class(gzipped, mimetype="application/json")
+        response.headers["Content-Encoding"] = "gzip"
+        return response
+    return current_app.response_class(body, mimetype="application/json")
 
 
-@api.post("/attempts")
-def attempts_create():
-    payload = request.get_json(silent=True) or {}
+# A batch spends one attempt token per item, so it can never hold more
+# attempts than a full bucket.
+MAX_BATCH_ATTEMPTS = min(100, int(attempt_limiter.burst))
+
+
+def attempt_payload_error(payload) -> Optional[str]:
+    """Describe why ``payload`` cannot be scored and stored, or return None."""
+    if not isinstance(payload, dict):
+        return "Attempt must be an object"
     required = {"play_name", "play_date", "route_selections", "events"}
     missing = required - payload.keys()
     if missing:
-        return jsonify({"error": f"Missing fields: {', '.join(sorted(missing))}"}), 400
-
-    play_name = payload["play_name"]
-    play_date = payload["play_date"]
+        return f"Missing fields: {', '.join(sorted(missing))}"
+    if not isinstance(payload["play_name"], str) or not isinstance(payload["play_date"], str):
+        return "play_name and play_date must be strings"
     route_selections = payload["route_selections"]
+    if not isinstance(route_selections, dict) or not all(
+        isinstance(key, str) and isinstance(value, str) for key, value in route_selections.items()
+    ):
+        return "route_selections must map receiver ids to route ids"
     events = payload["events"]
+    if not isinstance(events, list):
+        return "events must be a list"
+    for event in events:
+        if not isinstance(event, dict) or not isinstance(event.get("payload", {}), dict):
+            return "Each event must be an object with an object payload"
+        if event.get("type") == "target":
+            try:
+                float(event.get("payload", {}).get("separation", 0))
+            except (TypeError, ValueError):
+                return "Target separation must be a number"
+    return None
 
-    seed = seed_from_name(play_name)
-    config = generate_play_name(seed)
-    config.name = play_name
-    coverage_name = config.coverage
-    score = score_attempt(events)
 
-    user = current_user()
-    stored = store_attempt(
-        user_id=user["id"] if user else None,
+def attempt_response(attempt):
+    return {"attempt": attempt, "coverage": attempt["coverage_name"], "score": attempt["score"]}
+
+
+def submit_attempt(payload, user, idempotency_key=None):
+    """Score and store one attempt payload, returning ``(body, status)``.
+
+    A payload carrying an idempotency key the same user already stored
+    returns the original attempt without rescoring or writing anything.
+    """
+    if not isinstance(payload, dict):
+        return {"error": "Attempt must be an object"}, 400
+    user_id = user["id"] if user else None
+    idempotency_key = idempotency_key or payload.get("idempotency_key")
+    if idempotency_key is not None and (not isinstance(idempotency_key, str) or len(idempotency_key) > 128):
+        return {"error": "idempotency_key must be a string of at most 128 characters"}, 400
+    if idempotency_key:
+        existing = storage().get_attempt_by_idempotency_key(user_id, idempotency_key)
+        if existing:
+            return attempt_response(existing), 200
+
+    error = attempt_payload_error(payload)
+    if error:
+        return {"error": error}, 400
+
+    play_name = payload["play_name"]
+    events = payload["events"]
+    stored, created = storage().store_attempt(
+        user_id=user_id,
         play_name=play_name,
-        play_date=play_date,
-        route_selections=route_selections,
+        play_date=payload["play_date"],
+        route_selections=payload["route_selections"],
         events=events,
-        score=score,
-        coverage_name=coverage_name,
+        score=score_attempt(events),
+        coverage_name=config_for_play(play_name, payload["play_date"]).coverage,
+        idempotency_key=idempotency_key or None,
     )
+    return attempt_response(stored), 201 if created else 200
+
+
+@api.post("/attempts")
+@admission_controlled(attempt_limiter)
+def attempts_create():
+    payload = request.get_json(silent=True) or {}
+    body, status = submit_attempt(payload, current_user(), request.headers.get("Idempotency-Key"))
+    return jsonify(body), status
+
+
+def batch_cost() -> int:
+    payload = request.get_json(silent=True)
+    attempts = payload.get("attempts") if isinstance(payload, dict) else None
+    if not isinstance(attempts, list) or not 0 < len(attempts) <= MAX_BATCH_ATTEMPTS:
+        # Rejected by the view with 400; charge it like any other bad request.
+        return 1
+    return len(attempts)
+
 
-    response = {"attempt": stored, "coverage": coverage_name, "score": score}
-    return jsonify(response), 201
+@api.post("/attempts/batch")
+@admission_controlled(attempt_limiter, cost=batch_cost)
+def attempts_create_batch():
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict):
+        return jsonify({"error": "Batch must be an object with an attempts list"}), 400
+    attempts = payload.get("attempts")
+    if not isinstance(attempts, list) or not attempts:
+        return jsonify({"error": "attempts must be a non-empty list"}), 400
+    if len(attempts) > MAX_BATCH_ATTEMPTS:
+        return jsonify({"error": f"At most {MAX_BATCH_ATTEMPTS} attempts per batch"}), 400
+
+    user = current_user()
+    results = []
+    for item in attempts:
+        body, status = submit_attempt(item, user)
+        results.append({"status": status, **body})
+    return jsonify({"results": results})
 
 
 @api.get("/attempts")
 def attempts_list():
+    fields = None
+    if request.args.get("fields"):
+        fields = [field.strip() for field in request.args["fields"].split(",") if field.strip()]
+        unknown = set(fields) - set(ATTEMPT_FIELDS)
+        if unknown:
+            return jsonify({"error": f"Unknown fields: {', '.join(sorted(unknown))}"}), 400
     user = current_user()
-    return jsonify(list_attempts(user["id"] if user else None))
+    return jsonify(storage().list_attempts(user["id"] if user else None, fields=fields))
 
 
 @api.post("/admin/override")
@@ -154,8 +302,92 @@ def admin_override():
         return jsonify({"error": "Unauthorized"}), 403
     payload = request.get_json(silent=True) or {}
     play_name = payload.get("play_name")
-    if not play_name:
-        session.pop("override_play", None)
+    today = today_et()
+    if play_name is None or play_name == "":
+        storage().delete_scheduled_play(today)
+        play_cache().pop(today, None)
         return jsonify({"status": "cleared"})
-    session["override_play"] = play_name
+    if not is_play_name(play_name):
+        return jsonify({"error": "play_name must be a non-blank string"}), 400
+    store_schedule(today, play_name)
     return jsonify({"status": "set", "play_name": play_name})
+
+
+@api.get("/admin/schedule")
+def admin_schedule_list():
+    if not is_admin():
+        return jsonify({"error": "Unauthorized"}), 403
+    return jsonify(storage().list_scheduled_plays(from_date=today_et()))
+
+
+@api.post("/admin/schedule")
+def admin_schedule_create():
+    if not is_admin():
+        return jsonify({"error": "Unauthorized"}), 403
+    payload = request.get_json(silent=True) or {}
+    play_date = normalize_play_date(payload.get("play_date"))
+    play_name = payload.get("play_name")
+    if not is_play_name(play_name) or not play_date:
+        return jsonify({"error": "play_date (YYYY-MM-DD) and play_name required"}), 400
+    if play_date < today_et():
+        return jsonify({"error": "Cannot schedule a play in the past"}), 400
+    stored = store_schedule(play_date, play_name)
+    return jsonify({"status": "scheduled", **stored}), 201
+
+
+@api.delete("/admin/schedule/<play_date>")
+def admin_schedule_delete(play_date):
+    if not is_admin():
+        return jsonify({"error": "Unauthorized"}), 403
+    play_date = normalize_play_date(play_date)
+    if not play_date or not storage().delete_scheduled_play(play_date):
+        return jsonify({"error": "No play scheduled for that date"}), 404
+    play_cache().pop(play_date, None)
+    return jsonify({"status": "deleted", "play_date": play_date})
+
+
+@api.get("/admin/analytics")
+def admin_analytics():
+    if not is_admin():
+        return jsonify({"error": "Unauthorized"}), 403
+    if current_app.config["STORAGE_BACKEND"] != "sqlite":
+        return jsonify({"error": "Analytics requires the sqlite storage backend"}), 501
+    args = request.args
+    try:
+        rows = query_rollups(
+            group_by=args.get("group_by", "route_combo"),
+            coverage_name=args.get("coverage"),
+            base_coverage=args.get("base_coverage"),
+            formation=args.get("formation"),
+            order_by=args.get("order_by", "completion_rate"),
+            min_attempts=args.get("min_attempts", 1, type=int),
+            limit=max(1, min(args.get("limit", 20, type=int), 500)),
+        )
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    response = jsonify(rows)
+    response.headers["X-Rollups-Through-Attempt"] = str(rollup_high_water())
+    return response
+
+
+@api.get("/admin/admission")
+def admin_admission():
+    if not is_admin():
+        return jsonify({"error": "Unauthorized"}), 403
+    return jsonify(admission_stats.snapshot())
+
+
+@api.get("/admin/profiles")
+def admin_profiles():
+    if not is_admin():
+        return jsonify({"error": "Unauthorized"}), 403
+    return jsonify(list_profiles())
+
+
+@api.get("/admin/profiles/<name>")
+def admin_profile_download(name):
+    if not is_admin():
+        return jsonify({"error": "Unauthorized"}), 403
+    if not name.endswith(PROFILE_SUFFIXES):
+        return jsonify({"error": "Not a profile"}), 404
+    return send_from_directory(PROFILE_DIR, name, as_attachment=True)
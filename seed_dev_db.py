@@ -1,147 +1,200 @@
-from models import init_db, seed_play
-
-SAMPLE_PLAY = {
-    "id": 1,
-    "name": "Sample Play: Trips Right Slant",
-    "canvas": {"width": 1200, "height": 530},
-    "entities": [
-        {
-            "id": "wr1",
-            "type": "player",
-            "label": "WR1",
-            "x": 260,
-            "y": 160,
-            "radius": 12,
-            "color": "#1d4ed8",
-            "behavior": "static",
-        },
-        {
-            "id": "wr2",
-            "type": "player",
-            "label": "WR2",
-            "x": 260,
-            "y": 265,
-            "radius": 12,
-            "color": "#1d4ed8",
-            "behavior": "static",
-        },
-        {
-            "id": "wr3",
-            "type": "player",
-            "label": "WR3",
-            "x": 260,
-            "y": 370,
-            "radius": 12,
-            "color": "#1d4ed8",
-            "behavior": "static",
-        },
-        {
-            "id": "qb",
-            "type": "player",
-            "label": "QB",
-            "x": 210,
-            "y": 265,
-            "radius": 12,
-            "color": "#1d4ed8",
-            "behavior": "controlled",
-        },
-        {
-            "id": "rb",
-            "type": "player",
-            "label": "RB",
-            "x": 210,
-            "y": 330,
-            "radius": 11,
-            "color": "#1d4ed8",
-            "behavior": "static",
-        },
-        {
-            "id": "cb1",
-            "type": "npc",
-            "label": "CB1",
-            "x": 340,
-            "y": 160,
-            "radius": 12,
-            "color": "#dc2626",
-            "behavior": {"type": "follow", "target": "wr1", "speed": 70},
-        },
-        {
-            "id": "lb",
-            "type": "npc",
-            "label": "LB",
-            "x": 420,
-            "y": 265,
-            "radius": 13,
-            "color": "#dc2626",
-            "behavior": {"type": "patrol", "path": [{"x": 420, "y": 220}, {"x": 420, "y": 310}], "speed": 40},
-        },
-        {
-            "id": "s1",
-            "type": "npc",
-            "label": "S",
-            "x": 520,
-            "y": 200,
-            "radius": 13,
-            "color": "#dc2626",
-            "behavior": "static",
-        },
-        {
-            "id": "endzone",
-            "type": "target",
-            "label": "EZ",
-            "x": 1080,
-            "y": 265,
-            "radius": 55,
-            "color": "#22c55e",
-            "behavior": "static",
-        },
-    ],
-    "routes": [
-        {
-            "id": "SLANT",
-            "name": "Slant",
-            "points": [
-                {"x": 260, "y": 160},
-                {"x": 420, "y": 210},
-                {"x": 640, "y": 260},
-                {"x": 820, "y": 265},
-            ],
-            "color": "#f59e0b",
-        },
-        {
-            "id": "GO",
-            "name": "Go",
-            "points": [
-                {"x": 260, "y": 160},
-                {"x": 460, "y": 140},
-                {"x": 740, "y": 120},
-                {"x": 1020, "y": 100},
-            ],
-            "color": "#38bdf8",
-        },
-        {
-            "id": "OUT",
-            "name": "Out",
-            "points": [
-                {"x": 260, "y": 160},
-                {"x": 520, "y": 160},
-                {"x": 740, "y": 120},
-            ],
-            "color": "#a78bfa",
-        },
-    ],
-    "objectives": [
-        {
-            "id": "o1",
-            "type": "reach_zone",
-            "params": {"x": 1080, "y": 265, "radius": 55, "time_limit": 12},
-        },
-        {"id": "o2", "type": "avoid_collision", "params": {}},
-    ],
-}
+"""Generate a synthetic users/attempts dataset for load and scale testing.
 
+Rows are generated in parallel worker processes from real ``build_play``
+output and bulk-loaded by a single writer with ``executemany``, since SQLite
+only admits one writer at a time. The load PRAGMAs trade durability for
+speed, so only point this at a disposable database.
 
-if __name__ == "__main__":
+    python seed_dev_db.py --users 200000 --attempts 20000000 --workers 8
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from werkzeug.security import generate_password_hash
+
+import models
+from models import get_connection, init_db
+from playbook import (
+    ROUTES,
+    build_play,
+    config_for_play,
+    flatten_events,
+    generate_play_name,
+    score_attempts_batch,
+    seed_for_date,
+)
+
+BULK_LOAD_PRAGMAS = [
+    "PRAGMA journal_mode = OFF",
+    "PRAGMA synchronous = OFF",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -262144",
+    "PRAGMA locking_mode = EXCLUSIVE",
+]
+
+ROUTE_IDS = [route.upper() for route in ROUTES]
+
+# Per-process state populated by init_worker.
+_plays: List[Dict[str, Any]] = []
+_user_ids: Tuple[int, int] = (0, 0)
+
+
+def play_dates(days: int) -> List[str]:
+    today = date.today()
+    return [(today - timedelta(days=offset)).isoformat() for offset in range(days)]
+
+
+def init_worker(dates: List[str], user_ids: Tuple[int, int]) -> None:
+    global _plays, _user_ids
+    _plays = []
+    for play_date in dates:
+        seed = seed_for_date(play_date)
+        config = generate_play_name(seed)
+        play = build_play(config.name, seed, config)
+        _plays.append(
+            {
+                "play_date": play_date,
+                "name": config.name,
+                # Same derivation the attempt write path uses.
+                "coverage": config_for_play(config.name, play_date).coverage,
+                "base_plan": {item["receiver_id"]: item["route_id"] for item in play["base_plan"]},
+            }
+        )
+    _user_ids = user_ids
+
+
+def synthetic_events(rng: random.Random, changed: Dict[str, str], receivers: List[str]) -> List[Dict[str, Any]]:
+    events = [
+        {"t": 0.0, "type": "route_selected", "payload": {"receiver_id": receiver, "route_id": route}}
+        for receiver, route in changed.items()
+    ]
+    events.append({"t": 0.0, "type": "start", "payload": {}})
+    roll = rng.random()
+    if roll < 0.12:
+        events.append({"t": round(rng.uniform(1.2, 4.0), 2), "type": "sack", "payload": {"reason": "pressure"}})
+    elif roll < 0.18:
+        events.append({"t": 6.0, "type": "sack", "payload": {"reason": "timer"}})
+    else:
+        receiver = rng.choice(receivers)
+        separation = min(999.0, rng.gammavariate(3.0, 14.0))
+        outcome = "interception" if separation < 18 else "incomplete" if separation < 30 else "complete"
+        thrown_at = round(rng.uniform(1.0, 4.5), 2)
+        events.append(
+            {"t": thrown_at, "type": "target", "payload": {"receiver_id": receiver, "separation": f"{separation:.1f}"}}
+        )
+        events.append({"t": thrown_at, "type": outcome, "payload": {"receiver_id": receiver}})
+    return events
+
+
+def generate_attempts(chunk: Tuple[int, int, int]) -> List[List[Any]]:
+    chunk_index, count, seed = chunk
+    rng = random.Random(seed * 1_000_003 + chunk_index)
+    first_user, last_user = _user_ids
+    rows = []
+    event_lists = []
+    for _ in range(count):
+        play = rng.choice(_plays)
+        route_selections = dict(play["base_plan"])
+        receivers = list(route_selections)
+        changed = {receiver: rng.choice(ROUTE_IDS) for receiver in rng.sample(receivers, rng.randint(0, 3))}
+        route_selections.update(changed)
+        events = synthetic_events(rng, changed, receivers)
+        user_id: Optional[int] = None
+        if last_user >= first_user and rng.random() > 0.05:
+            user_id = rng.randint(first_user, last_user)
+        created_at = datetime.fromisoformat(play["play_date"]).replace(tzinfo=timezone.utc) + timedelta(
+            seconds=rng.randrange(86400)
+        )
+        event_lists.append(events)
+        rows.append(
+            [
+                user_id,
+                play["name"],
+                play["play_date"],
+                json.dumps(route_selections),
+                json.dumps(events),
+                None,
+                play["coverage"],
+                created_at.isoformat(),
+            ]
+        )
+    scores = score_attempts_batch(*flatten_events(event_lists), len(event_lists))
+    for row, score in zip(rows, scores.tolist()):
+        row[5] = score
+    return rows
+
+
+def seed_users(conn, count: int) -> Tuple[int, int]:
+    start = (conn.execute("SELECT COALESCE(MAX(id), 0) FROM users").fetchone()[0]) + 1
+    if count <= 0:
+        return start, start - 1
+    password_hash = generate_password_hash("password")
+    now_iso = datetime.now(timezone.utc).isoformat()
+    conn.execute("BEGIN")
+    conn.executemany(
+        "INSERT INTO users (id, email, password_hash, created_at) VALUES (?, ?, ?, ?)",
+        ((user_id, f"loadtest{user_id}@example.com", password_hash, now_iso) for user_id in range(start, start + count)),
+    )
+    conn.execute("COMMIT")
+    return start, start + count - 1
+
+
+def seed_attempts(conn, count: int, dates: List[str], user_ids: Tuple[int, int], workers: int, chunk_size: int, seed: int) -> None:
+    chunks = [
+        (index, min(chunk_size, count - offset), seed)
+        for index, offset in enumerate(range(0, count, chunk_size))
+    ]
+    inserted = 0
+    started = time.perf_counter()
+    with multiprocessing.Pool(workers, initializer=init_worker, initargs=(dates, user_ids)) as pool:
+        for rows in pool.imap_unordered(generate_attempts, chunks):
+            conn.execute("BEGIN")
+            conn.executemany(
+                """
+                INSERT INTO attempts (user_id, play_name, play_date, route_selections, events, score, coverage_name, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                rows,
+            )
+            conn.execute("COMMIT")
+            inserted += len(rows)
+            rate = inserted / max(time.perf_counter() - started, 1e-9)
+            print(f"\r{inserted}/{count} attempts ({rate:,.0f}/s)", end="", flush=True)
+    print()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", default=models.DB_PATH, help="database file (default: %(default)s)")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--attempts", type=int, default=10000)
+    parser.add_argument("--days", type=int, default=90, help="number of past daily plays to spread attempts over")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=20000, help="attempts generated and committed per batch")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    models.DB_PATH = args.db
     init_db()
-    seed_play(SAMPLE_PLAY)
-    print("Seeded play to dailyread.db")
+    conn = get_connection()
+    conn.isolation_level = None
+    for pragma in BULK_LOAD_PRAGMAS:
+        conn.execute(pragma)
+
+    user_ids = seed_users(conn, args.users)
+    print(f"Seeded {args.users} users")
+    seed_attempts(conn, args.attempts, play_dates(args.days), user_ids, args.workers, args.chunk_size, args.seed)
+    conn.execute("ANALYZE")
+    conn.close()
+    print(f"Seeded {args.attempts} attempts to {args.db}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+import json
+import threading
+from abc import ABC, abstractmethod
+from bisect import insort
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import models
+from models import ATTEMPT_FIELDS, JSON_ATTEMPT_FIELDS
+
+
+class StorageBackend(ABC):
+    """Persistence for users, attempts and scheduled plays, selected per app by ``STORAGE_BACKEND``."""
+
+    @abstractmethod
+    def create_user(self, email: str, password_hash: Optional[str]) -> int: ...
+
+    @abstractmethod
+    def get_user_by_email(self, email: str) -> Optional[Dict[str, Any]]: ...
+
+    @abstractmethod
+    def get_user_by_id(self, user_id: int) -> Optional[Dict[str, Any]]: ...
+
+    @abstractmethod
+    def get_attempt_by_idempotency_key(
+        self, user_id: Optional[int], idempotency_key: str
+    ) -> Optional[Dict[str, Any]]: ...
+
+    @abstractmethod
+    def store_attempt(
+        self,
+        user_id: Optional[int],
+        play_name: str,
+        play_date: str,
+        route_selections: Dict[str, str],
+        events: List[Dict[str, Any]],
+        score: float,
+        coverage_name: str,
+        idempotency_key: Optional[str] = None,
+    ) -> Tuple[Dict[str, Any], bool]: ...
+
+    @abstractmethod
+    def list_attempts(
+        self, user_id: Optional[int] = None, fields: Optional[Sequence[str]] = None
+    ) -> List[Dict[str, Any]]: ...
+
+    @abstractmethod
+    def schedule_play(self, play_date: str, play_name: str, coverage_name: str, play_json: str) -> Dict[str, Any]: ...
+
+    @abstractmethod
+    def get_scheduled_play(self, play_date: str) -> Optional[Dict[str, Any]]: ...
+
+    @abstractmethod
+    def list_scheduled_plays(self, from_date: Optional[str] = None) -> List[Dict[str, Any]]: ...
+
+    @abstractmethod
+    def delete_scheduled_play(self, play_date: str) -> bool: ...
+
+
+class SQLiteStorage(StorageBackend):
+    def create_user(self, email, password_hash):
+        return models.create_user(email, password_hash)
+
+    def get_user_by_email(self, email):
+        return models.get_user_by_email(email)
+
+    def get_user_by_id(self, user_id):
+        return models.get_user_by_id(user_id)
+
+    def get_attempt_by_idempotency_key(self, user_id, idempotency_key):
+        return models.get_attempt_by_idempotency_key(user_id, idempotency_key)
+
+    def store_attempt(self, *args, **kwargs):
+        return models.store_attempt(*args, **kwargs)
+
+    def list_attempts(self, user_id=None, fields=None):
+        return models.list_attempts(user_id, fields=fields)
+
+    def schedule_play(self, play_date, play_name, coverage_name, play_json):
+        return models.schedule_play(play_date, play_name, coverage_name, play_json)
+
+    def get_scheduled_play(self, play_date):
+        return models.get_scheduled_play(play_date)
+
+    def list_scheduled_plays(self, from_date=None):
+        return models.list_scheduled_plays(from_date)
+
+    def delete_scheduled_play(self, play_date):
+        return models.delete_scheduled_play(play_date)
+
+
+class MemoryStorage(StorageBackend):
+    """Thread-safe in-process storage for tests and benchmarks.
+
+    Attempts are indexed by id and idempotency key, with ``(created_at, id)``
+    keys kept sorted globally and per user so history reads never sort.
+    JSON fields are stored encoded and decoded on every read, so callers
+    always get objects of their own.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._users: Dict[int, Dict[str, Any]] = {}
+        self._users_by_email: Dict[str, int] = {}
+        self._attempts: Dict[int, Dict[str, Any]] = {}
+        self._attempts_by_key: Dict[Tuple[Optional[int], str], int] = {}
+        self._attempt_order: List[Tuple[str, int]] = []
+        self._attempt_order_by_user: Dict[Optional[int], List[Tuple[str, int]]] = {}
+        self._scheduled_plays: Dict[str, Dict[str, Any]] = {}
+        self._next_user_id = 1
+        self._next_attempt_id = 1
+
+    def create_user(self, email, password_hash):
+        with self._lock:
+            if email in self._users_by_email:
+                raise ValueError(f"User {email} already exists")
+            user_id = self._next_user_id
+            self._next_user_id += 1
+            self._users[user_id] = {
+                "id": user_id,
+                "email": email,
+                "password_hash": password_hash,
+                "created_at": datetime.now(timezone.utc).isoformat(),
+            }
+            self._users_by_email[email] = user_id
+            return user_id
+
+    def get_user_by_email(self, email):
+        with self._lock:
+            user_id = self._users_by_email.get(email)
+            return dict(self._users[user_id]) if user_id is not None else None
+
+    def get_user_by_id(self, user_id):
+        with self._lock:
+            user = self._users.get(user_id)
+            return dict(user) if user else None
+
+    def get_attempt_by_idempotency_key(self, user_id, idempotency_key):
+        with self._lock:
+            attempt_id = self._attempts_by_key.get((user_id, idempotency_key))
+            return self._attempt_view(self._attempts[attempt_id]) if attempt_id is not None else None
+
+    def store_attempt(
+        self,
+        user_id,
+        play_name,
+        play_date,
+        route_selections,
+        events,
+        score,
+        coverage_name,
+        idempotency_key=None,
+    ):
+        now_iso = datetime.now(timezone.utc).isoformat()
+        with self._lock:
+            owner_key = (user_id, idempotency_key)
+            if idempotency_key is not None and owner_key in self._attempts_by_key:
+                return self._attempt_view(self._attempts[self._attempts_by_key[owner_key]]), False
+            attempt_id = self._next_attempt_id
+            self._next_attempt_id += 1
+            attempt = {
+                "id": attempt_id,
+                "user_id": user_id,
+                "play_name": play_name,
+                "play_date": play_date,
+                "route_selections": json.dumps(route_selections),
+                "events": json.dumps(events),
+                "score": score,
+                "coverage_name": coverage_name,
+                "created_at": now_iso,
+            }
+            self._attempts[attempt_id] = attempt
+            if idempotency_key is not None:
+                self._attempts_by_key[owner_key] = attempt_id
+            order_key = (now_iso, attempt_id)
+            insort(self._attempt_order, order_key)
+            insort(self._attempt_order_by_user.setdefault(user_id, []), order_key)
+            return self._attempt_view(attempt), True
+
+    def list_attempts(self, user_id=None, fields=None):
+        columns = [field for field in ATTEMPT_FIELDS if field in fields] if fields else ATTEMPT_FIELDS
+        with self._lock:
+            order = self._attempt_order if user_id is None else self._attempt_order_by_user.get(user_id, [])
+            return [self._attempt_view(self._attempts[attempt_id], columns) for _, attempt_id in reversed(order)]
+
+    @staticmethod
+    def _attempt_view(attempt: Dict[str, Any], columns: Sequence[str] = ATTEMPT_FIELDS) -> Dict[str, Any]:
+        return {
+            column: json.loads(attempt[column]) if column in JSON_ATTEMPT_FIELDS else attempt[column]
+            for column in columns
+        }
+
+    def schedule_play(self, play_date, play_name, coverage_name, play_json):
+        stored = {
+            "play_date": play_date,
+            "play_name": play_name,
+            "coverage_name": coverage_name,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+        }
+        with self._lock:
+            self._scheduled_plays[play_date] = {**stored, "play_json": play_json}
+        return stored
+
+    def get_scheduled_play(self, play_date):
+        with self._lock:
+            scheduled = self._scheduled_plays.get(play_date)
+            return dict(scheduled) if scheduled else None
+
+    def list_scheduled_plays(self, from_date=None):
+        with self._lock:
+            return [
+                {key: value for key, value in scheduled.items() if key != "play_json"}
+                for play_date, scheduled in sorted(self._scheduled_plays.items())
+                if from_date is None or play_date >= from_date
+            ]
+
+    def delete_scheduled_play(self, play_date):
+        with self._lock:
+            return self._scheduled_plays.pop(play_date, None) is not None
+
+
+STORAGE_BACKENDS = {
+    "sqlite": SQLiteStorage,
+    "memory": MemoryStorage,
+}
+
+
+def create_storage(name: str) -> StorageBackend:
+    try:
+        return STORAGE_BACKENDS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown storage backend {name!r}; expected one of {', '.join(STORAGE_BACKENDS)}") from None
@@ -0,0 +1,37 @@
+import pytest
+
+import models
+from admission import WriteSlots, attempt_limiter, auth_limiter
+
+
+@pytest.fixture
+def make_app(tmp_path, monkeypatch):
+    from app import create_app
+
+    monkeypatch.setattr(models, "DB_PATH", str(tmp_path / "dailyread.db"))
+    monkeypatch.setattr(models, "REPLICA_ENABLED", False)
+    for limiter in (attempt_limiter, auth_limiter):
+        monkeypatch.setattr(limiter, "_buckets", {})
+        monkeypatch.setattr(limiter, "slots", WriteSlots(limiter.scope, limiter.slots.limit))
+
+    def make(backend="memory"):
+        return create_app({"STORAGE_BACKEND": backend, "TESTING": True})
+
+    return make
+
+
+@pytest.fixture
+def app(make_app):
+    return make_app()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def admin_client(client):
+    with client.session_transaction() as session:
+        session["is_admin"] = True
+    return client
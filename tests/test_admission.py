@@ -0,0 +1,112 @@
+import pytest
+from flask import Flask
+
+import admission
+from admission import RateLimiter, WriteSlots, admission_controlled, attempt_limiter, stats
+from routes import MAX_BATCH_ATTEMPTS
+
+BURST = int(attempt_limiter.burst)
+ATTEMPT = {
+    "play_name": "Mesh",
+    "play_date": "2024-03-01",
+    "route_selections": {"WR1": "GO"},
+    "events": [{"t": 0.0, "type": "start", "payload": {}}],
+}
+
+
+def post_attempt(client):
+    return client.post("/api/attempts", json=ATTEMPT)
+
+
+def post_batch(client, size):
+    return client.post("/api/attempts/batch", json={"attempts": [ATTEMPT] * size})
+
+
+def test_rate_limited_after_burst(client):
+    assert [post_attempt(client).status_code for _ in range(BURST)] == [201] * BURST
+    response = post_attempt(client)
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "1"
+
+
+def test_batch_spends_one_token_per_attempt(client):
+    assert post_batch(client, BURST - 2).status_code == 200
+    response = post_batch(client, 3)
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "1"
+    assert post_batch(client, 2).status_code == 200
+    assert post_attempt(client).status_code == 429
+
+
+def test_oversized_batch_is_rejected_for_one_token(client):
+    assert MAX_BATCH_ATTEMPTS == min(100, BURST)
+    response = post_batch(client, MAX_BATCH_ATTEMPTS + 1)
+    assert response.status_code == 400
+    assert "At most" in response.get_json()["error"]
+    assert [post_attempt(client).status_code for _ in range(BURST - 1)] == [201] * (BURST - 1)
+    assert post_attempt(client).status_code == 429
+
+
+def test_overloaded_spends_no_tokens(client, monkeypatch):
+    full = WriteSlots("attempts", 0)
+    monkeypatch.setattr(attempt_limiter, "slots", full)
+    response = post_attempt(client)
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+    monkeypatch.setattr(attempt_limiter, "slots", WriteSlots("attempts", 1))
+    assert [post_attempt(client).status_code for _ in range(BURST)] == [201] * BURST
+
+
+def test_auth_has_its_own_slots(client, monkeypatch):
+    monkeypatch.setattr(attempt_limiter, "slots", WriteSlots("attempts", 0))
+    assert post_attempt(client).status_code == 503
+    assert client.post("/api/auth/register", json={"email": "ada@example.com", "password": "pw"}).status_code == 200
+
+
+def test_cost_over_burst_is_413_and_counted():
+    limiter = RateLimiter("test_oversized", rate=1, burst=2, max_in_flight=1)
+    app = Flask(__name__)
+    app.secret_key = "test"
+    app.add_url_rule("/write", "write", admission_controlled(limiter, cost=lambda: 3)(lambda: "ok"), methods=["POST"])
+
+    assert app.test_client().post("/write").status_code == 413
+    assert stats.snapshot()["scopes"]["test_oversized"]["too_large"] == 1
+
+
+def test_admission_counters(admin_client, monkeypatch):
+    before = stats.snapshot()["scopes"].get("attempts", {})
+    post_attempt(admin_client)
+    monkeypatch.setattr(attempt_limiter, "slots", WriteSlots("attempts", 0))
+    post_attempt(admin_client)
+
+    counters = admin_client.get("/api/admin/admission").get_json()["scopes"]["attempts"]
+    assert counters["admitted"] == before.get("admitted", 0) + 1
+    assert counters["overloaded"] == before.get("overloaded", 0) + 1
+    assert counters["in_flight"] == 0
+
+
+@pytest.mark.skipif(admission.fcntl is None, reason="needs flock")
+def test_shared_slots_are_enforced_across_pools(tmp_path):
+    # Two pools on one directory stand in for two worker processes.
+    first, second = WriteSlots("attempts", 1), WriteSlots("attempts", 1)
+    first.share(str(tmp_path))
+    second.share(str(tmp_path))
+
+    handle = first.try_acquire()
+    assert handle is not None
+    assert second.try_acquire() is None
+    first.release(handle)
+    other = second.try_acquire()
+    assert other is not None
+    second.release(other)
+
+
+@pytest.mark.parametrize("limit", [1, 3])
+def test_local_slots_bound_concurrency(limit):
+    slots = WriteSlots("attempts", limit)
+    handles = [slots.try_acquire() for _ in range(limit)]
+    assert None not in handles
+    assert slots.try_acquire() is None
+    slots.release(handles[0])
+    assert slots.try_acquire() is not None
@@ -0,0 +1,37 @@
+import pytest
+
+import models
+from analytics import refresh_rollups
+
+
+@pytest.fixture
+def sqlite_admin_client(make_app):
+    client = make_app("sqlite").test_client()
+    with client.session_transaction() as session:
+        session["is_admin"] = True
+    return client
+
+
+def seed_rollups(combos):
+    for route in combos:
+        models.store_attempt(None, "Mesh", "2024-03-01", {"WR1": route}, [{"type": "complete"}], 10.0, "Cover 2")
+    refresh_rollups()
+
+
+def test_analytics_groups_rollups(sqlite_admin_client):
+    seed_rollups(["GO", "GO", "SLANT"])
+    response = sqlite_admin_client.get("/api/admin/analytics?order_by=attempts")
+    assert response.status_code == 200
+    assert [(row["route_combo"], row["attempts"]) for row in response.get_json()] == [("WR1:GO", 2), ("WR1:SLANT", 1)]
+    assert response.headers["X-Rollups-Through-Attempt"] == "3"
+
+
+@pytest.mark.parametrize("limit", [-1, 0])
+def test_analytics_limit_is_clamped(sqlite_admin_client, limit):
+    seed_rollups(["GO", "SLANT", "POST"])
+    assert len(sqlite_admin_client.get(f"/api/admin/analytics?limit={limit}").get_json()) == 1
+
+
+@pytest.mark.parametrize("min_attempts", [0, -5])
+def test_analytics_rejects_min_attempts_below_one(sqlite_admin_client, min_attempts):
+    assert sqlite_admin_client.get(f"/api/admin/analytics?min_attempts={min_attempts}").status_code == 400
@@ -0,0 +1,51 @@
+import pytest
+
+ATTEMPT = {
+    "play_name": "Mesh",
+    "play_date": "2024-03-01",
+    "route_selections": {"WR1": "GO"},
+    "events": [{"t": 0.0, "type": "start", "payload": {}}, {"t": 2.0, "type": "complete", "payload": {}}],
+}
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend_client(request, make_app):
+    return make_app(request.param).test_client()
+
+
+def register(client, email):
+    assert client.post("/api/auth/register", json={"email": email, "password": "pw"}).status_code == 200
+
+
+def test_repeated_idempotency_key_returns_original(backend_client):
+    register(backend_client, "ada@example.com")
+    first = backend_client.post("/api/attempts", json=ATTEMPT, headers={"Idempotency-Key": "retry-1"})
+    assert first.status_code == 201
+    retry = backend_client.post(
+        "/api/attempts", json={**ATTEMPT, "events": []}, headers={"Idempotency-Key": "retry-1"}
+    )
+    assert retry.status_code == 200
+    assert retry.get_json() == first.get_json()
+    assert len(backend_client.get("/api/attempts").get_json()) == 1
+
+
+def test_idempotency_key_is_per_user(backend_client):
+    register(backend_client, "ada@example.com")
+    first = backend_client.post("/api/attempts", json={**ATTEMPT, "idempotency_key": "retry-1"})
+    backend_client.post("/api/auth/logout")
+    register(backend_client, "bob@example.com")
+    other = backend_client.post("/api/attempts", json={**ATTEMPT, "idempotency_key": "retry-1"})
+    assert other.status_code == 201
+    assert other.get_json()["attempt"]["id"] != first.get_json()["attempt"]["id"]
+
+
+def test_batch_validates_each_item(client):
+    bad_separation = {**ATTEMPT, "events": [{"type": "target", "payload": {"separation": "far"}}]}
+    response = client.post("/api/attempts/batch", json={"attempts": [ATTEMPT, {"play_name": "Mesh"}, bad_separation]})
+    assert response.status_code == 200
+    assert [result["status"] for result in response.get_json()["results"]] == [201, 400, 400]
+
+
+@pytest.mark.parametrize("body", [[1], "attempts", 3, {"attempts": []}, {"attempts": {"0": ATTEMPT}}])
+def test_batch_rejects_malformed_bodies(client, body):
+    assert client.post("/api/attempts/batch", json=body).status_code == 400
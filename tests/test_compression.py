@@ -0,0 +1,44 @@
+import gzip
+import json
+from types import SimpleNamespace
+
+import compression
+
+GZIP = {"Accept-Encoding": "gzip"}
+
+
+def test_play_served_gzipped_from_cache(client, monkeypatch):
+    calls = []
+
+    def counting_compress(data, compresslevel):
+        calls.append(len(data))
+        return gzip.compress(data, compresslevel=compresslevel)
+
+    monkeypatch.setattr(compression, "gzip", SimpleNamespace(compress=counting_compress))
+    plain = client.get("/api/play/today")
+    first = client.get("/api/play/today", headers=GZIP)
+    second = client.get("/api/play/today", headers=GZIP)
+
+    assert "Content-Encoding" not in plain.headers
+    assert first.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in first.headers["Vary"]
+    assert gzip.decompress(first.data) == plain.data
+    assert second.data == first.data
+    assert len(calls) == 1
+
+
+def test_attempt_history_compressed_when_large(client):
+    attempt = {
+        "play_name": "Mesh",
+        "play_date": "2024-03-01",
+        "route_selections": {f"WR{index}": "GO" for index in range(5)},
+        "events": [{"t": 0.0, "type": "start", "payload": {}}] * 10,
+    }
+    client.post("/api/attempts/batch", json={"attempts": [attempt] * 5})
+
+    response = client.get("/api/attempts", headers=GZIP)
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert len(json.loads(gzip.decompress(response.data))) == 5
+
+    small = client.get("/api/attempts?fields=id", headers=GZIP)
+    assert "Content-Encoding" not in small.headers
@@ -0,0 +1,99 @@
+import math
+import random
+
+import numpy as np
+import pytest
+
+from playbook import flatten_events, score_attempt, score_attempts_batch
+
+SEPARATION_CASES = [
+    0,
+    0.0,
+    -3.5,
+    "12.5",
+    " 4.25 ",
+    "1e1",
+    "-0.0",
+    "nan",
+    "inf",
+    "-inf",
+    float("nan"),
+    math.inf,
+    4.9975,
+    0.0001375,
+    2.675,
+]
+
+
+def random_attempt(rng):
+    events = []
+    for _ in range(rng.randint(0, 8)):
+        event_type = rng.choice(["complete", "interception", "sack", "target", "incomplete", "start", "stop"])
+        payload = {}
+        if event_type == "target" and rng.random() < 0.9:
+            payload["separation"] = rng.choice(
+                [
+                    rng.choice(SEPARATION_CASES),
+                    rng.uniform(-10, 10),
+                    str(round(rng.uniform(0, 60), rng.randint(0, 4))),
+                    rng.randint(-5, 50),
+                ]
+            )
+        events.append({"type": event_type, "payload": payload} if rng.random() < 0.95 else {"type": event_type})
+    return events
+
+
+def assert_batch_matches(attempts):
+    expected = [score_attempt(events) for events in attempts]
+    actual = score_attempts_batch(*flatten_events(attempts), len(attempts))
+    assert actual.shape == (len(attempts),)
+    assert actual.tolist() == expected
+
+
+def test_batch_matches_scalar_on_random_attempts():
+    rng = random.Random(20261019)
+    assert_batch_matches([random_attempt(rng) for _ in range(50000)])
+
+
+@pytest.mark.parametrize("separation", SEPARATION_CASES)
+def test_batch_matches_scalar_on_edge_separations(separation):
+    attempts = [
+        [{"type": "target", "payload": {"separation": separation}}],
+        [{"type": "target", "payload": {"separation": separation}}, {"type": "complete"}],
+        [{"type": "target", "payload": {"separation": 1}}, {"type": "target", "payload": {"separation": separation}}],
+    ]
+    assert_batch_matches(attempts)
+
+
+def test_batch_matches_scalar_on_rounding_ties():
+    # separation * 40 lands on or next to .xx5 for every value in this grid.
+    attempts = [[{"type": "target", "payload": {"separation": step / 1000 / 40}}] for step in range(0, 200000, 5)]
+    assert_batch_matches(attempts)
+
+
+def test_batch_handles_empty_input():
+    attempt_index, type_codes, separations = flatten_events([])
+    assert len(attempt_index) == len(type_codes) == len(separations) == 0
+    assert score_attempts_batch(attempt_index, type_codes, separations, 0).tolist() == []
+
+
+def test_batch_handles_attempts_without_events():
+    assert_batch_matches([[], [{"type": "complete"}], []])
+
+
+def test_flatten_rejects_unparseable_separation_like_scalar():
+    events = [{"type": "target", "payload": {"separation": "wide open"}}]
+    with pytest.raises(ValueError):
+        score_attempt(events)
+    with pytest.raises(ValueError):
+        flatten_events([events])
+
+
+def test_flatten_events_columns():
+    attempt_index, type_codes, separations = flatten_events(
+        [[{"type": "start"}, {"type": "target", "payload": {"separation": "7.5"}}], [{"type": "sack"}]]
+    )
+    assert attempt_index.tolist() == [0, 0, 1]
+    assert separations.dtype == np.float64
+    assert separations.tolist() == [0.0, 7.5, 0.0]
+    assert len(set(type_codes.tolist())) == 3
@@ -0,0 +1,34 @@
+import pytest
+
+import profiling
+from profiling import PROFILE_HEADER
+
+PROFILE = {PROFILE_HEADER: "1"}
+
+
+@pytest.fixture
+def profile_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILE_DIR", str(tmp_path / "profiles"))
+    return tmp_path / "profiles"
+
+
+def test_profile_is_written(admin_client, profile_dir):
+    assert admin_client.get("/api/health", headers=PROFILE).status_code == 200
+    [profile] = admin_client.get("/api/admin/profiles").get_json()
+    assert "-GET-api.health-" in profile["name"]
+    assert profile["name"].endswith(".pstats")
+    assert not profiling._active_profile.locked()
+
+
+def test_unwritable_profile_dir_keeps_response(admin_client, profile_dir, caplog):
+    profile_dir.write_text("not a directory")
+    response = admin_client.get("/api/health", headers=PROFILE)
+    assert response.status_code == 200
+    assert response.get_json() == {"status": "ok"}
+    assert "Could not save request profile" in caplog.text
+    assert not profiling._active_profile.locked()
+
+
+def test_profile_requires_admin(client, profile_dir):
+    client.get("/api/health", headers=PROFILE)
+    assert not profile_dir.exists()
@@ -0,0 +1,79 @@
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+import routes
+from routes import today_et
+
+
+def future_date(days=30):
+    return (date.fromisoformat(today_et()) + timedelta(days=days)).isoformat()
+
+
+def test_schedule_requires_admin(client):
+    assert client.get("/api/admin/schedule").status_code == 403
+    assert client.post("/api/admin/schedule", json={"play_date": future_date(), "play_name": "Mesh"}).status_code == 403
+
+
+def test_schedule_round_trip(admin_client):
+    play_date = future_date()
+    response = admin_client.post("/api/admin/schedule", json={"play_date": play_date, "play_name": "Mesh"})
+    assert response.status_code == 201
+    assert response.get_json()["play_name"] == "Mesh"
+    assert [play["play_date"] for play in admin_client.get("/api/admin/schedule").get_json()] == [play_date]
+
+    assert admin_client.delete(f"/api/admin/schedule/{play_date}").status_code == 200
+    assert admin_client.delete(f"/api/admin/schedule/{play_date}").status_code == 404
+    assert admin_client.get("/api/admin/schedule").get_json() == []
+
+
+def test_schedule_normalizes_dates(admin_client):
+    year = date.fromisoformat(today_et()).year + 1
+    response = admin_client.post("/api/admin/schedule", json={"play_date": f"{year}-3-7", "play_name": "Mesh"})
+    assert response.get_json()["play_date"] == f"{year}-03-07"
+    assert admin_client.delete(f"/api/admin/schedule/{year}-3-07").get_json()["play_date"] == f"{year}-03-07"
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        {"play_date": "2099-02-30", "play_name": "Mesh"},
+        {"play_date": "soon", "play_name": "Mesh"},
+        {"play_date": "2099-01-01", "play_name": 123},
+        {"play_date": "2099-01-01", "play_name": "   "},
+        {"play_date": "2099-01-01"},
+        {"play_date": "2000-01-01", "play_name": "Mesh"},
+    ],
+)
+def test_schedule_rejects_bad_input(admin_client, payload):
+    assert admin_client.post("/api/admin/schedule", json=payload).status_code == 400
+
+
+def test_override_schedules_today(admin_client):
+    assert admin_client.post("/api/admin/override", json={"play_name": "Mesh"}).status_code == 200
+    assert admin_client.get("/api/play/today").get_json()["name"] == "Mesh"
+    [scheduled] = admin_client.get("/api/admin/schedule").get_json()
+    assert scheduled["play_date"] == today_et()
+
+    assert admin_client.post("/api/admin/override", json={"play_name": ""}).get_json() == {"status": "cleared"}
+    assert admin_client.get("/api/play/today").get_json()["name"] != "Mesh"
+    assert admin_client.get("/api/admin/schedule").get_json() == []
+
+
+@pytest.mark.parametrize("play_name", [123, ["Mesh"], "   "])
+def test_override_rejects_bad_names(admin_client, play_name):
+    assert admin_client.post("/api/admin/override", json={"play_name": play_name}).status_code == 400
+
+
+def test_play_cache_expires(app, client, monkeypatch):
+    clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(routes, "time", SimpleNamespace(monotonic=lambda: clock.now))
+    default_name = client.get("/api/play/today").get_json()["name"]
+
+    # Written behind this process's back, as another worker would.
+    app.extensions["dailyread.storage"].schedule_play(today_et(), "Mesh", "Cover 2", '{"name": "Mesh"}')
+    clock.now += routes.PLAY_CACHE_SECONDS - 1
+    assert client.get("/api/play/today").get_json()["name"] == default_name
+    clock.now += 2
+    assert client.get("/api/play/today").get_json()["name"] == "Mesh"
@@ -0,0 +1,160 @@
+import os
+
+import pytest
+
+import models
+from storage import MemoryStorage, SQLiteStorage
+
+
+@pytest.fixture
+def sqlite_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(models, "DB_PATH", str(tmp_path / "dailyread.db"))
+    monkeypatch.setattr(models, "REPLICA_ENABLED", False)
+    models.init_db()
+    return models.DB_PATH
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request):
+    if request.param == "sqlite":
+        request.getfixturevalue("sqlite_db")
+        return SQLiteStorage()
+    return MemoryStorage()
+
+
+def store(backend, user_id, play_name="Flood", idempotency_key=None, **overrides):
+    attempt = {
+        "user_id": user_id,
+        "play_name": play_name,
+        "play_date": "2024-03-01",
+        "route_selections": {"WR1": "GO", "TE": "FLAT"},
+        "events": [{"t": 0.0, "type": "start", "payload": {}}],
+        "score": 7.5,
+        "coverage_name": "Cover 2",
+        "idempotency_key": idempotency_key,
+    }
+    attempt.update(overrides)
+    return backend.store_attempt(**attempt)
+
+
+def test_user_round_trip(backend):
+    user_id = backend.create_user("ada@example.com", "hash")
+    by_email = backend.get_user_by_email("ada@example.com")
+    assert by_email["id"] == user_id
+    assert by_email["password_hash"] == "hash"
+    assert backend.get_user_by_id(user_id)["email"] == "ada@example.com"
+    assert backend.get_user_by_email("nobody@example.com") is None
+    assert backend.get_user_by_id(user_id + 1) is None
+
+
+def test_attempt_round_trip(backend):
+    user_id = backend.create_user("ada@example.com", "hash")
+    stored, created = store(backend, user_id)
+    assert created
+    [listed] = backend.list_attempts(user_id)
+    assert listed == stored
+    assert listed["route_selections"] == {"WR1": "GO", "TE": "FLAT"}
+    assert listed["events"] == [{"t": 0.0, "type": "start", "payload": {}}]
+
+
+def test_attempts_list_newest_first_per_user(backend):
+    first = backend.create_user("ada@example.com", "hash")
+    second = backend.create_user("bob@example.com", "hash")
+    ids = [store(backend, user_id, play_name=f"Play {i}")[0]["id"] for i, user_id in enumerate([first, second, first])]
+    anonymous = store(backend, None)[0]["id"]
+
+    assert [attempt["id"] for attempt in backend.list_attempts(first)] == [ids[2], ids[0]]
+    assert [attempt["id"] for attempt in backend.list_attempts(second)] == [ids[1]]
+    assert [attempt["id"] for attempt in backend.list_attempts()] == [anonymous, ids[2], ids[1], ids[0]]
+
+
+def test_attempts_list_projection(backend):
+    user_id = backend.create_user("ada@example.com", "hash")
+    stored, _ = store(backend, user_id)
+    [projected] = backend.list_attempts(user_id, fields=["score", "id", "play_date"])
+    assert list(projected) == ["id", "play_date", "score"]
+    assert projected == {"id": stored["id"], "play_date": "2024-03-01", "score": 7.5}
+
+
+def test_idempotency_key_scoped_to_owner(backend):
+    first = backend.create_user("ada@example.com", "hash")
+    second = backend.create_user("bob@example.com", "hash")
+    original, created = store(backend, first, idempotency_key="retry-1")
+    assert created
+    replay, created = store(backend, first, idempotency_key="retry-1", score=0.0)
+    assert not created
+    assert replay["id"] == original["id"]
+    assert replay["score"] == 7.5
+    assert backend.get_attempt_by_idempotency_key(first, "retry-1")["id"] == original["id"]
+
+    other, created = store(backend, second, idempotency_key="retry-1")
+    assert created
+    assert other["id"] != original["id"]
+    assert backend.get_attempt_by_idempotency_key(None, "retry-1") is None
+
+
+def test_memory_store_is_isolated_from_callers():
+    backend = MemoryStorage()
+    route_selections = {"WR1": "GO"}
+    events = [{"t": 0.0, "type": "start", "payload": {}}]
+    stored, _ = store(backend, None, route_selections=route_selections, events=events, idempotency_key="retry-1")
+    route_selections["WR1"] = "SLANT"
+    events[0]["payload"]["late"] = True
+    events.append({"t": 1.0, "type": "sack", "payload": {}})
+
+    for returned in (
+        stored,
+        backend.list_attempts()[0],
+        backend.get_attempt_by_idempotency_key(None, "retry-1"),
+        store(backend, None, idempotency_key="retry-1")[0],
+    ):
+        returned["route_selections"]["WR1"] = "POST"
+        returned["events"][0]["payload"]["late"] = True
+        returned["events"].clear()
+
+    [listed] = backend.list_attempts()
+    assert listed["route_selections"] == {"WR1": "GO"}
+    assert listed["events"] == [{"t": 0.0, "type": "start", "payload": {}}]
+
+
+def test_scheduled_play_round_trip(backend):
+    assert backend.get_scheduled_play("2024-03-02") is None
+    backend.schedule_play("2024-03-02", "Mesh", "Cover 3", '{"name": "Mesh"}')
+    backend.schedule_play("2024-03-01", "Flood", "Cover 2", '{"name": "Flood"}')
+    backend.schedule_play("2024-03-02", "Smash", "Cover 1", '{"name": "Smash"}')
+
+    scheduled = backend.get_scheduled_play("2024-03-02")
+    assert scheduled["play_name"] == "Smash"
+    assert scheduled["play_json"] == '{"name": "Smash"}'
+    assert [play["play_date"] for play in backend.list_scheduled_plays()] == ["2024-03-01", "2024-03-02"]
+    [upcoming] = backend.list_scheduled_plays(from_date="2024-03-02")
+    assert set(upcoming) == {"play_date", "play_name", "coverage_name", "created_at"}
+
+    assert backend.delete_scheduled_play("2024-03-02")
+    assert not backend.delete_scheduled_play("2024-03-02")
+    assert backend.get_scheduled_play("2024-03-02") is None
+
+
+def test_memory_app_never_opens_sqlite(make_app):
+    client = make_app("memory").test_client()
+
+    play = client.get("/api/play/today").get_json()
+    assert client.post("/api/auth/register", json={"email": "ada@example.com", "password": "pw"}).status_code == 200
+    response = client.post(
+        "/api/attempts",
+        json={
+            "play_name": play["name"],
+            "play_date": play["play_date"],
+            "route_selections": {},
+            "events": [{"t": 0.0, "type": "start", "payload": {}}],
+        },
+    )
+    assert response.status_code == 201
+    assert [attempt["play_name"] for attempt in client.get("/api/attempts").get_json()] == [play["name"]]
+
+    with client.session_transaction() as session:
+        session["is_admin"] = True
+    assert client.post("/api/admin/override", json={"play_name": "Custom"}).status_code == 200
+    assert client.get("/api/play/today").get_json()["name"] == "Custom"
+    assert client.get("/api/admin/analytics").status_code == 501
+    assert not os.path.exists(models.DB_PATH)